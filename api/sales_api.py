@@ -1,8 +1,21 @@
-from fastapi import FastAPI, HTTPException, Query
+import os
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime, date
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+from datetime import date
+from typing import Optional, List, Dict, Any, Tuple, Literal, Callable
 from pydantic import BaseModel
+import pandas as pd
+import pyarrow as pa
+import msgspec
+import orjson
 from services.local_data import (
     get_daily_sales,
     get_daily_predictions,
@@ -17,10 +30,112 @@ from models.responses import (
     RegionalSalesResponse
 )
 
+# Rollups of the historical (2007-2009) daily sales, built once at startup
+MONTHLY_ROLLUPS: Dict[Tuple[int, int], Dict[str, Any]] = {}
+QUARTERLY_ROLLUPS: Dict[Tuple[int, int], Dict[str, Any]] = {}
+WEEKLY_ROLLUPS: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+# get_daily_sales results per date range: in-flight calls are shared by concurrent
+# requests and the most recently used completed ranges stay memoized
+DAILY_SALES_CACHE_SIZE = 512
+_daily_sales_tasks: "OrderedDict[Tuple[Optional[date], Optional[date]], asyncio.Task]" = OrderedDict()
+_daily_sales_stats = {'hits': 0, 'misses': 0}
+
+def _forget_failed(key: Tuple[Optional[date], Optional[date]], task: asyncio.Task):
+    """Drop a failed or cancelled lookup so the next request retries it."""
+    if (task.cancelled() or task.exception() is not None) and _daily_sales_tasks.get(key) is task:
+        del _daily_sales_tasks[key]
+
+async def coalesced_daily_sales(start_date: Optional[date], end_date: Optional[date]) -> List[dict]:
+    """Run get_daily_sales once per date range and reuse the result for later requests."""
+    key = (start_date, end_date)
+    task = _daily_sales_tasks.get(key)
+    if task is None:
+        _daily_sales_stats['misses'] += 1
+        task = asyncio.ensure_future(get_daily_sales(start_date, end_date))
+        task.add_done_callback(lambda done: _forget_failed(key, done))
+        _daily_sales_tasks[key] = task
+        if len(_daily_sales_tasks) > DAILY_SALES_CACHE_SIZE:
+            _daily_sales_tasks.popitem(last=False)
+    else:
+        _daily_sales_stats['hits'] += 1
+        _daily_sales_tasks.move_to_end(key)
+    return await asyncio.shield(task)
+
+# Bulk endpoints can also be served as an Arrow IPC stream (?format=arrow)
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def arrow_stream_bytes(records: List[dict]) -> bytes:
+    """Encode a list of records as an Arrow IPC stream."""
+    table = pa.Table.from_pylist(records)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# Response cache settings
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
+CACHE_EXPIRE_SECONDS = 3600
+
+def request_key_builder(func, namespace: str = "", *, request: Optional[Request] = None, **kwargs) -> str:
+    """Build a cache key from the request path and its sorted query parameters."""
+    if request is None:
+        return f"{namespace}:{func.__module__}:{func.__name__}"
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return f"{namespace}:{request.url.path}?{query}"
+
+def _rollup(grouped: pd.DataFrame, period_name: str) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """Convert a (year, period) aggregate frame into a dict of plain records."""
+    rollups = {}
+    for (year, period), row in grouped.iterrows():
+        total_sales = float(row['total_sales'])
+        total_records = int(row['total_records'])
+        rollups[(int(year), int(period))] = {
+            'year': int(year),
+            period_name: int(period),
+            'date': row['date'].date().isoformat(),
+            'total_sales': total_sales,
+            'avg_sales': total_sales / total_records if total_records else 0.0,
+            'total_records': total_records
+        }
+    return rollups
+
+async def build_rollups():
+    """Load the full daily history once and materialize monthly/quarterly/weekly rollups."""
+    daily = pd.DataFrame(await get_daily_sales(None, None))
+    if daily.empty:
+        return
+    daily['date'] = pd.to_datetime(daily['date'])
+    aggregations = dict(
+        date=('date', 'min'),
+        total_sales=('total_sales', 'sum'),
+        total_records=('total_records', 'sum')
+    )
+    dates = daily['date'].dt
+    iso = dates.isocalendar()
+
+    MONTHLY_ROLLUPS.clear()
+    MONTHLY_ROLLUPS.update(_rollup(daily.groupby([dates.year, dates.month]).agg(**aggregations), 'month'))
+    QUARTERLY_ROLLUPS.clear()
+    QUARTERLY_ROLLUPS.update(_rollup(daily.groupby([dates.year, dates.quarter]).agg(**aggregations), 'quarter'))
+    WEEKLY_ROLLUPS.clear()
+    WEEKLY_ROLLUPS.update(_rollup(daily.groupby([iso['year'], iso['week']]).agg(**aggregations), 'week'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the Redis-backed response cache and the sales rollups."""
+    await build_rollups()
+    redis = aioredis.from_url(REDIS_URL)
+    FastAPICache.init(RedisBackend(redis), prefix="sales-ninja", key_builder=request_key_builder)
+    yield
+    await redis.close()
+
 app = FastAPI(
     title="Sales Ninja API",
     description="Backend API for Sales Analytics Dashboard",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -128,6 +243,54 @@ class QuarterlyData(BaseModel):
     avg_sales: float
     total_records: int
 
+class WeeklyData(BaseModel):
+    year: int
+    week: int
+    total_sales: float
+    avg_sales: float
+    total_records: int
+
+class DashboardData(BaseModel):
+    actuals: List[SalesData]
+    predictions: List[PredictionData]
+    regions: List[RegionData]
+
+# Fixed-schema daily sales record, encoded by msgspec without Pydantic validation
+class SalesMetricsRecord(msgspec.Struct):
+    date: str
+    total_sales: float
+    total_records: int
+    average_value: float
+
+_json_encoder = msgspec.json.Encoder()
+
+def sales_metrics_bytes(records: List[dict]) -> bytes:
+    """Encode trusted daily sales records straight to JSON bytes."""
+    return _json_encoder.encode([SalesMetricsRecord(**record) for record in records])
+
+async def cached_sales_response(
+    request: Request,
+    start_date: date,
+    end_date: Optional[date],
+    encode: Callable[[List[dict]], bytes],
+    media_type: str
+) -> Response:
+    """Serve an encoded daily sales body from the response cache, building it on a miss.
+
+    The @cache decorator's JSON coder cannot store Response objects, so routes
+    that return pre-encoded bytes keep those bytes in the cache backend directly.
+    """
+    key = f"{FastAPICache.get_prefix()}:{request_key_builder(None, 'body', request=request)}"
+    backend = FastAPICache.get_backend()
+    body = await backend.get(key)
+    if body is None:
+        body = encode(await coalesced_daily_sales(start_date, end_date))
+        await backend.set(key, body, expire=CACHE_EXPIRE_SECONDS)
+    return Response(content=body, media_type=media_type)
+
+# Constant liveness payload, encoded once at import
+_HEALTH_BYTES = orjson.dumps({"status": "healthy"})
+
 # API Routes
 @app.get("/")
 async def root():
@@ -135,22 +298,27 @@ async def root():
 
 @app.get("/api/daily-sales", response_model=List[SalesMetrics])
 async def daily_sales_endpoint(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
+    request: Request,
+    start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: Literal["json", "arrow"] = Query("json", description="Response format (json or arrow)")
 ):
     """
     Get daily sales data between start_date and end_date
     """
     try:
-        start = datetime.strptime(start_date, "%Y-%m-%d").date()
-        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
-        return await get_daily_sales(start, end)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        if format == "arrow":
+            return await cached_sales_response(
+                request, start_date, end_date, arrow_stream_bytes, ARROW_STREAM_MEDIA_TYPE
+            )
+        return await cached_sales_response(
+            request, start_date, end_date, sales_metrics_bytes, "application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/monthly-sales", response_model=List[SalesMetrics])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def monthly_sales_endpoint(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)")
@@ -159,11 +327,22 @@ async def monthly_sales_endpoint(
     Get monthly aggregated sales data
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        start, end = (start_date.year, start_date.month), (end_date.year, end_date.month)
+        return [
+            {
+                'date': row['date'],
+                'total_sales': row['total_sales'],
+                'total_records': row['total_records'],
+                'average_value': row['avg_sales']
+            }
+            for key, row in MONTHLY_ROLLUPS.items()
+            if start <= key <= end
+        ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/kpi-metrics", response_model=KPIMetrics)
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def kpi_metrics_endpoint(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)")
@@ -172,11 +351,12 @@ async def kpi_metrics_endpoint(
     Get overall KPI metrics for the specified date range
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        return await coalesced_daily_sales(start_date, end_date)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/promotion-impact", response_model=List[PromotionImpact])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def promotion_impact_endpoint(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: date = Query(..., description="End date (YYYY-MM-DD)")
@@ -185,38 +365,55 @@ async def promotion_impact_endpoint(
     Get promotional vs non-promotional sales comparison
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        return await coalesced_daily_sales(start_date, end_date)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/product-categories", response_model=List[ProductCategorySales])
 async def product_category_sales_endpoint(
+    request: Request,
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: date = Query(..., description="End date (YYYY-MM-DD)")
+    end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    format: Literal["json", "arrow"] = Query("json", description="Response format (json or arrow)")
 ):
     """
     Get sales metrics by product category
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        if format == "arrow":
+            return await cached_sales_response(
+                request, start_date, end_date, arrow_stream_bytes, ARROW_STREAM_MEDIA_TYPE
+            )
+        return await cached_sales_response(
+            request, start_date, end_date, sales_metrics_bytes, "application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/store-performance", response_model=List[StorePerformance])
 async def store_performance_endpoint(
+    request: Request,
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: date = Query(..., description="End date (YYYY-MM-DD)")
+    end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
+    format: Literal["json", "arrow"] = Query("json", description="Response format (json or arrow)")
 ):
     """
     Get sales performance by store
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        if format == "arrow":
+            return await cached_sales_response(
+                request, start_date, end_date, arrow_stream_bytes, ARROW_STREAM_MEDIA_TYPE
+            )
+        return await cached_sales_response(
+            request, start_date, end_date, sales_metrics_bytes, "application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/actuals", response_model=List[SalesData])
 async def get_actuals(
+    request: Request,
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
 ):
@@ -224,11 +421,14 @@ async def get_actuals(
     Get actual sales data between start_date and end_date
     """
     try:
-        return await get_daily_sales(start_date, end_date)
+        return await cached_sales_response(
+            request, start_date, end_date, sales_metrics_bytes, "application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/predictions", response_model=List[PredictionData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_predictions(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
@@ -242,6 +442,7 @@ async def get_predictions(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/comparison", response_model=List[ComparisonData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_comparison(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
@@ -255,6 +456,7 @@ async def get_comparison(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/accuracy", response_model=AccuracyMetrics)
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_accuracy(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
@@ -268,6 +470,7 @@ async def get_accuracy(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/regions", response_model=List[RegionData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_regions(
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
@@ -279,6 +482,7 @@ async def get_regions(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/region/{region}/timeseries", response_model=List[TimeSeriesData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_region_sales(
     region: str,
     start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
@@ -290,29 +494,72 @@ async def get_region_sales(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/dashboard", response_model=DashboardData)
+@cache(expire=CACHE_EXPIRE_SECONDS)
+async def get_dashboard(
+    start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)")
+):
+    """Get actuals, predictions and regional sales for the dashboard in one response"""
+    try:
+        actuals, predictions, regions = await asyncio.gather(
+            coalesced_daily_sales(start_date, end_date),
+            get_daily_predictions(start_date, end_date),
+            get_sales_by_region(start_date, end_date)
+        )
+        return {
+            "actuals": actuals,
+            "predictions": predictions,
+            "regions": regions
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/monthly", response_model=List[MonthlyData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_monthly_data(
     year: Optional[int] = Query(None, description="Filter by year (YYYY)")
 ):
     """Get monthly aggregated sales data"""
     try:
-        return await get_daily_sales(None, None)
+        return [row for (row_year, _), row in MONTHLY_ROLLUPS.items() if year is None or row_year == year]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/quarterly", response_model=List[QuarterlyData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
 async def get_quarterly_data(
     year: Optional[int] = Query(None, description="Filter by year (YYYY)")
 ):
     """Get quarterly aggregated sales data"""
     try:
-        return await get_daily_sales(None, None)
+        return [row for (row_year, _), row in QUARTERLY_ROLLUPS.items() if year is None or row_year == year]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/weekly", response_model=List[WeeklyData])
+@cache(expire=CACHE_EXPIRE_SECONDS)
+async def get_weekly_data(
+    year: Optional[int] = Query(None, description="Filter by ISO year (YYYY)")
+):
+    """Get weekly (ISO week) aggregated sales data"""
+    try:
+        return [row for (row_year, _), row in WEEKLY_ROLLUPS.items() if year is None or row_year == year]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/debug/cache")
+async def cache_info():
+    """Report hit/miss counts for the in-process daily sales cache"""
+    return {
+        **_daily_sales_stats,
+        "maxsize": DAILY_SALES_CACHE_SIZE,
+        "currsize": len(_daily_sales_tasks)
+    }
+
 @app.get("/health")
 async def health_check():
     """
     Simple health check endpoint
     """
-    return {"status": "healthy"} 
\ No newline at end of file
+    return Response(content=_HEALTH_BYTES, media_type="application/json") 
\ No newline at end of file
@@ -1,10 +1,16 @@
+from __future__ import annotations
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-from datetime import datetime
-import plotly.express as px
-from typing import Optional
+from datetime import date
+from typing import TYPE_CHECKING, Optional, Tuple
 import traceback
 
+# plotly is imported lazily by the figure builders, after the first paint
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 from config.settings import settings, DataSource
 from services.data_source import get_data_source
 
@@ -15,41 +21,179 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state
-if 'data_source' not in st.session_state:
-    try:
-        st.session_state.data_source = get_data_source()
-    except Exception as e:
-        st.error(f"Failed to initialize data source: {str(e)}")
-        st.error("Detailed error: " + traceback.format_exc())
-        st.stop()
+# Sidebar filter options, built once instead of on every rerun
+YEAR_OPTIONS = (2007, 2008, 2009)
+MIN_DATE = date(2007, 1, 1)
+MAX_DATE = date(2009, 12, 31)
+DEFAULT_END = date(2007, 12, 31)
+
+# Initialize the data source shared by all sessions
+try:
+    get_data_source()
+except Exception as e:
+    st.error(f"Failed to initialize data source: {str(e)}")
+    st.error("Detailed error: " + traceback.format_exc())
+    st.stop()
+
+@st.cache_data(ttl=600, show_spinner=False)  # Re-check every 10 minutes
+def load_dataset_etag() -> str:
+    """Version token of the source tables, used to key the data caches."""
+    return get_data_source().dataset_version()
+
+def canonical_filters(
+    year: Optional[int],
+    start_date: Optional[date],
+    end_date: Optional[date]
+) -> Tuple[Optional[int], Optional[date], Optional[date]]:
+    """Collapse equivalent filters to one cache key: a date range spanning
+    exactly one calendar year is the same query as that year."""
+    if (
+        year is None and start_date and end_date
+        and start_date == date(start_date.year, 1, 1)
+        and end_date == date(start_date.year, 12, 31)
+    ):
+        return start_date.year, None, None
+    return year, start_date, end_date
+
+# Shared read-only frames: returned by reference instead of unpickled per rerun
+@st.cache_resource(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def _load_data(etag: str, y: Optional[int], sd: Optional[date], ed: Optional[date]) -> tuple:
+    return get_data_source().load_dashboard_data(
+        year=y,
+        start_date=sd,
+        end_date=ed
+    )
 
 def load_data(
+    etag: str,
     year: Optional[int] = None,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
 ) -> tuple:
     """Load and cache data from the configured data source."""
     try:
-        @st.cache_data(ttl=3600)  # Cache for 1 hour
-        def _load_data(y: Optional[int], sd: Optional[str], ed: Optional[str]):
-            with st.spinner("Loading sales data..."):
-                try:
-                    return st.session_state.data_source.load_dashboard_data(
-                        year=y,
-                        start_date=sd,
-                        end_date=ed
-                    )
-                except Exception as e:
-                    st.error(f"Error loading data: {str(e)}")
-                    st.error("Detailed error: " + traceback.format_exc())
-                    raise
-        return _load_data(year, start_date, end_date)
+        with st.spinner("Loading sales data..."):
+            return _load_data(etag, year, start_date, end_date)
     except Exception as e:
         st.error(f"Error in load_data: {str(e)}")
         st.error("Detailed error: " + traceback.format_exc())
         raise
 
+# Aggregations computed by the data source (in BigQuery for the BigQuery backend),
+# so only the small aggregated frames are transferred and cached. The leading
+# etag argument keys each entry to the dataset version as well as the filters.
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def load_daily_totals(etag: str, year: Optional[int], start_date: Optional[date], end_date: Optional[date]) -> tuple:
+    """Load daily (actual, predicted) net sales totals."""
+    return get_data_source().load_daily_totals(year=year, start_date=start_date, end_date=end_date)
+
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def load_dashboard_aggregate(etag: str, year: Optional[int], start_date: Optional[date], end_date: Optional[date]) -> pd.DataFrame:
+    """Load the pre-aggregated daily x category x store sales frame."""
+    return get_data_source().load_dashboard_aggregate(year=year, start_date=start_date, end_date=end_date)
+
+# Category and store totals are rolled up from the one small aggregate frame
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def load_category_totals(etag: str, year: Optional[int], start_date: Optional[date], end_date: Optional[date]) -> pd.DataFrame:
+    """Load net sales totals per product category."""
+    aggregate = load_dashboard_aggregate(etag, year, start_date, end_date)
+    return aggregate.groupby("ProductCategoryName", as_index=False, observed=True)["net_sales"].sum()
+
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def load_store_totals(etag: str, year: Optional[int], start_date: Optional[date], end_date: Optional[date]) -> pd.DataFrame:
+    """Load net sales and units sold per store."""
+    aggregate = load_dashboard_aggregate(etag, year, start_date, end_date)
+    return aggregate.groupby(["StoreName", "StoreType"], as_index=False, observed=True)[["net_sales", "SalesQuantity"]].sum()
+
+@st.cache_data(ttl=3600)  # Cache for 1 hour
+def compute_kpis(etag: str, year: Optional[int], start_date: Optional[date], end_date: Optional[date]) -> dict:
+    """Compute the overview KPIs in a single aggregation pass over the actuals."""
+    df_actual, _ = _load_data(etag, year, start_date, end_date)
+    kpis = df_actual.agg({"net_sales": ["sum", "mean"], "SalesQuantity": "sum"})
+    return {
+        "total_sales": float(kpis.at["sum", "net_sales"]),
+        "avg_sales": float(kpis.at["mean", "net_sales"]),
+        "total_quantity": int(kpis.at["sum", "SalesQuantity"])
+    }
+
+# Figure builders, cached on the (small) aggregated frames so reruns with
+# unchanged filters reuse the built figure
+@st.cache_data(ttl=3600)
+def build_trend_fig(daily_sales: pd.DataFrame, daily_predicted: pd.DataFrame) -> go.Figure:
+    """Build the daily actual vs predicted sales trend chart."""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=daily_sales["date"].to_numpy(),
+        y=daily_sales["net_sales"].to_numpy(),
+        mode="lines",
+        name="Actual"
+    ))
+    
+    if not daily_predicted.empty:
+        fig.add_trace(go.Scatter(
+            x=daily_predicted["date"].to_numpy(),
+            y=daily_predicted["net_sales"].to_numpy(),
+            mode="lines",
+            name="Predicted",
+            line=dict(dash="dash")
+        ))
+    
+    fig.update_layout(
+        title="Daily Sales Trend",
+        xaxis_title="Date",
+        yaxis_title="Sales Amount ($)"
+    )
+    return fig
+
+@st.cache_data(ttl=3600)
+def build_category_fig(category_sales: pd.DataFrame) -> go.Figure:
+    """Build the horizontal bar chart of sales per product category."""
+    import plotly.graph_objects as go
+    
+    category_sales = category_sales.sort_values("net_sales", ascending=True)
+    fig = go.Figure(go.Bar(
+        x=category_sales["net_sales"].to_numpy(),
+        y=category_sales["ProductCategoryName"].to_numpy(),
+        orientation="h"
+    ))
+    fig.update_layout(
+        title="Sales by Product Category",
+        xaxis_title="Sales Amount ($)",
+        yaxis_title="Category"
+    )
+    return fig
+
+@st.cache_data(ttl=3600)
+def build_store_fig(store_sales: pd.DataFrame) -> go.Figure:
+    """Build the store sales vs units sold scatter, one trace per store type."""
+    import plotly.graph_objects as go
+    
+    store_names = store_sales["StoreName"].to_numpy()
+    store_types = store_sales["StoreType"].to_numpy()
+    sales = store_sales["net_sales"].to_numpy()
+    quantities = store_sales["SalesQuantity"].to_numpy()
+    
+    fig = go.Figure()
+    for store_type in np.unique(store_types):
+        mask = store_types == store_type
+        fig.add_trace(go.Scatter(
+            x=sales[mask],
+            y=quantities[mask],
+            mode="markers",
+            name=str(store_type),
+            text=store_names[mask],
+            hovertemplate="%{text}<br>Total Sales ($)=%{x}<br>Units Sold=%{y}<extra></extra>"
+        ))
+    fig.update_layout(
+        title="Store Performance Analysis",
+        xaxis_title="Total Sales ($)",
+        yaxis_title="Units Sold",
+        legend_title="Store Type"
+    )
+    return fig
+
 def main():
     try:
         st.title("📊 Sales Ninja Dashboard")
@@ -68,7 +212,7 @@ def main():
         if filter_type == "Year":
             year = st.sidebar.selectbox(
                 "Select Year",
-                options=[2007, 2008, 2009],
+                options=YEAR_OPTIONS,
                 index=0
             )
             start_date = None
@@ -79,23 +223,23 @@ def main():
             with col1:
                 start_date = st.date_input(
                     "Start Date",
-                    value=datetime(2007, 1, 1),
-                    min_value=datetime(2007, 1, 1),
-                    max_value=datetime(2009, 12, 31)
+                    value=MIN_DATE,
+                    min_value=MIN_DATE,
+                    max_value=MAX_DATE
                 )
             with col2:
                 end_date = st.date_input(
                     "End Date",
-                    value=datetime(2007, 12, 31),
-                    min_value=datetime(2007, 1, 1),
-                    max_value=datetime(2009, 12, 31)
+                    value=DEFAULT_END,
+                    min_value=MIN_DATE,
+                    max_value=MAX_DATE
                 )
-            start_date = start_date.strftime("%Y-%m-%d") if start_date else None
-            end_date = end_date.strftime("%Y-%m-%d") if end_date else None
         
         try:
             # Load data
-            df_actual, df_predicted = load_data(year, start_date, end_date)
+            year, start_date, end_date = canonical_filters(year, start_date, end_date)
+            etag = load_dataset_etag()
+            df_actual, df_predicted = load_data(etag, year, start_date, end_date)
             
             if df_actual.empty:
                 st.warning("No actual sales data found for the selected period.")
@@ -109,73 +253,46 @@ def main():
             st.header("📈 Sales Overview")
             col1, col2, col3 = st.columns(3)
             
+            kpis = compute_kpis(etag, year, start_date, end_date)
+            
             with col1:
-                total_sales = df_actual["net_sales"].sum()
-                st.metric("Total Sales", f"${total_sales:,.2f}")
+                st.metric("Total Sales", f"${kpis['total_sales']:,.2f}")
             
             with col2:
-                avg_sales = df_actual["net_sales"].mean()
-                st.metric("Average Sales", f"${avg_sales:,.2f}")
+                st.metric("Average Sales", f"${kpis['avg_sales']:,.2f}")
             
             with col3:
-                total_quantity = df_actual["SalesQuantity"].sum()
-                st.metric("Total Units Sold", f"{total_quantity:,}")
+                st.metric("Total Units Sold", f"{kpis['total_quantity']:,}")
             
             # Sales Trend
             st.subheader("Sales Trend")
-            if not df_actual.empty:
-                daily_sales = df_actual.groupby("date")["net_sales"].sum().reset_index()
-                fig = px.line(
-                    daily_sales,
-                    x="date",
-                    y="net_sales",
-                    title="Daily Sales Trend",
-                    labels={"date": "Date", "net_sales": "Sales Amount ($)"}
+            daily_sales, daily_predicted = load_daily_totals(etag, year, start_date, end_date)
+            if not daily_sales.empty:
+                st.plotly_chart(
+                    build_trend_fig(daily_sales, daily_predicted),
+                    key="sales_trend",
+                    use_container_width=True
                 )
-                
-                if not df_predicted.empty:
-                    daily_predicted = df_predicted.groupby("date")["net_sales"].sum().reset_index()
-                    fig.add_scatter(
-                        x=daily_predicted["date"],
-                        y=daily_predicted["net_sales"],
-                        name="Predicted",
-                        line=dict(dash="dash")
-                    )
-                
-                st.plotly_chart(fig, use_container_width=True)
             
             # Product Categories
-            if not df_actual.empty and "ProductCategoryName" in df_actual.columns:
+            category_sales = load_category_totals(etag, year, start_date, end_date)
+            if not category_sales.empty:
                 st.subheader("Sales by Product Category")
-                category_sales = df_actual.groupby("ProductCategoryName")["net_sales"].sum().sort_values(ascending=True)
-                if not category_sales.empty:
-                    fig = px.bar(
-                        category_sales,
-                        orientation="h",
-                        title="Sales by Product Category",
-                        labels={"value": "Sales Amount ($)", "ProductCategoryName": "Category"}
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(
+                    build_category_fig(category_sales),
+                    key="category_sales",
+                    use_container_width=True
+                )
             
             # Store Performance
-            if not df_actual.empty and all(col in df_actual.columns for col in ["StoreName", "StoreType"]):
+            store_sales = load_store_totals(etag, year, start_date, end_date)
+            if not store_sales.empty:
                 st.subheader("Store Performance")
-                store_sales = df_actual.groupby(["StoreName", "StoreType"])[["net_sales", "SalesQuantity"]].sum().reset_index()
-                if not store_sales.empty:
-                    fig = px.scatter(
-                        store_sales,
-                        x="net_sales",
-                        y="SalesQuantity",
-                        color="StoreType",
-                        hover_data=["StoreName"],
-                        title="Store Performance Analysis",
-                        labels={
-                            "net_sales": "Total Sales ($)",
-                            "SalesQuantity": "Units Sold",
-                            "StoreType": "Store Type"
-                        }
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(
+                    build_store_fig(store_sales),
+                    key="store_performance",
+                    use_container_width=True
+                )
             
         except Exception as e:
             st.error("Error loading or processing data")
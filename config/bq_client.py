@@ -1,16 +1,20 @@
 from google.cloud import bigquery
 from google.oauth2 import service_account
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
 import os
-from dotenv import load_dotenv
 import json
 import logging
+from functools import lru_cache
+from config.environment import load_env_file
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
-load_dotenv()
+load_env_file()
 
 # Constants - load from environment variables with fallbacks
 PROJECT_ID = os.getenv('PROJECT_ID', 'nodal-clock-456815-g3')
@@ -18,11 +22,30 @@ DATASET = os.getenv('DATASET', 'dashboard_data')
 ACTUALS_TABLE = os.getenv('ACTUALS_TABLE', 'dashboard_merged_data')
 PREDICTIONS_TABLE = os.getenv('PREDICTIONS_TABLE', 'dashboard_prediction_data')
 
+# Size of the shared keep-alive HTTP connection pool used by the client
+HTTP_POOL_SIZE = int(os.getenv('BQ_HTTP_POOL_SIZE', '50'))
+
+def get_pooled_session() -> AuthorizedSession:
+    """
+    Build an authorized HTTP session whose connection pool is large enough
+    for concurrent requests, so queries reuse open connections instead of
+    paying a new TCP/TLS handshake each time.
+    """
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount('https://', adapter)
+    return session
+
+@lru_cache(maxsize=1)
 def get_bigquery_client():
     """
     Get an authenticated BigQuery client using service account credentials.
     Credentials should be provided through GOOGLE_APPLICATION_CREDENTIALS
     environment variable pointing to the key file location.
+
+    The client is built on first use and shared for the life of the process,
+    so importing this module never touches credentials.
     """
     try:
         # Use GOOGLE_APPLICATION_CREDENTIALS environment variable
@@ -30,16 +53,10 @@ def get_bigquery_client():
             logger.error("GOOGLE_APPLICATION_CREDENTIALS environment variable is not set")
             raise ValueError("Missing Google Cloud credentials")
             
-        return bigquery.Client(project=PROJECT_ID)
+        client = bigquery.Client(project=PROJECT_ID, _http=get_pooled_session())
+        logger.info("Successfully initialized BigQuery client")
+        return client
 
     except Exception as e:
         logger.error(f"Failed to initialize BigQuery client: {e}")
         raise
-
-# Initialize the client
-try:
-    client = get_bigquery_client()
-    logger.info("Successfully initialized BigQuery client")
-except Exception as e:
-    logger.error(f"Error initializing BigQuery client: {e}")
-    raise 
\ No newline at end of file
@@ -1,15 +1,30 @@
 """Environment configuration for the Sales Ninja dashboard."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
+from dotenv import dotenv_values
+
+@lru_cache(maxsize=1)
+def load_env_file() -> bool:
+    """Read the project .env file into os.environ once per process.
+    
+    Every entrypoint reaches this through config.settings or config.bq_client;
+    variables already set in the environment take precedence.
+    """
+    env_path = Path(__file__).parent.parent / '.env'
+    if not env_path.exists():
+        return False
+    values = dotenv_values(env_path)
+    for key, value in values.items():
+        if value is not None:
+            os.environ.setdefault(key, value)
+    return bool(values)
 
 def load_environment():
     """Load environment variables from .env file or set defaults."""
     # Try to load from .env file if it exists
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        load_dotenv(env_path)
+    load_env_file()
     
     # Set required environment variables with defaults
     os.environ.setdefault('DATA_SOURCE', 'bigquery')
@@ -1,37 +1,61 @@
 import os
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 from pathlib import Path
 
+from config.environment import load_env_file
+
 class DataSource(Enum):
     BIGQUERY = "bigquery"
     REST_API = "rest_api"
 
+@dataclass(frozen=True, slots=True)
 class Settings:
-    def __init__(self):
-        # Data Source Configuration
-        self.DATA_SOURCE: DataSource = self._get_data_source()
-        
-        # BigQuery Settings
-        self.GCP_PROJECT_ID: str = os.getenv("GCP_PROJECT_ID", "")
-        self.BQ_DATASET: str = os.getenv("BQ_DATASET", "dashboard_data")
-        self.BQ_ACTUALS_TABLE: str = os.getenv("BQ_ACTUALS_TABLE", "dashboard_merged_data")
-        self.BQ_PREDICTIONS_TABLE: str = os.getenv("BQ_PREDICTIONS_TABLE", "dashboard_prediction_data")
-        self.GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = self._get_credentials_path()
-        
-        # REST API Settings
-        self.API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8000")
-        self.API_VERSION: str = os.getenv("API_VERSION", "v1")
-        self.API_KEY: Optional[str] = os.getenv("API_KEY")
-        
-        # Data Loading Settings
-        self.DEFAULT_YEAR: int = int(os.getenv("DEFAULT_YEAR", "2007"))
-        self.MAX_ROWS: int = 700  # Fixed at 700 rows
-        
+    # Data Source Configuration
+    DATA_SOURCE: DataSource
+    
+    # BigQuery Settings
+    GCP_PROJECT_ID: str
+    BQ_DATASET: str
+    BQ_ACTUALS_TABLE: str
+    BQ_PREDICTIONS_TABLE: str
+    BQ_AGGREGATE_VIEW: str
+    GOOGLE_APPLICATION_CREDENTIALS: Optional[str]
+    
+    # REST API Settings
+    API_BASE_URL: str
+    API_VERSION: str
+    API_KEY: Optional[str] = field(repr=False)
+    
+    # Data Loading Settings
+    DEFAULT_YEAR: int
+    MAX_ROWS: int = 700  # Fixed at 700 rows
+    
+    def __post_init__(self):
         # Validate settings
         self.validate()
     
-    def _get_data_source(self) -> DataSource:
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Read the configuration from environment variables."""
+        return cls(
+            DATA_SOURCE=cls._get_data_source(),
+            GCP_PROJECT_ID=os.getenv("GCP_PROJECT_ID", ""),
+            BQ_DATASET=os.getenv("BQ_DATASET", "dashboard_data"),
+            BQ_ACTUALS_TABLE=os.getenv("BQ_ACTUALS_TABLE", "dashboard_merged_data"),
+            BQ_PREDICTIONS_TABLE=os.getenv("BQ_PREDICTIONS_TABLE", "dashboard_prediction_data"),
+            BQ_AGGREGATE_VIEW=os.getenv("BQ_AGGREGATE_VIEW", "daily_category_store_agg"),
+            GOOGLE_APPLICATION_CREDENTIALS=cls._get_credentials_path(),
+            API_BASE_URL=os.getenv("API_BASE_URL", "http://localhost:8000"),
+            API_VERSION=os.getenv("API_VERSION", "v1"),
+            API_KEY=os.getenv("API_KEY"),
+            DEFAULT_YEAR=int(os.getenv("DEFAULT_YEAR", "2007"))
+        )
+    
+    @staticmethod
+    def _get_data_source() -> DataSource:
         """Get and validate data source from environment."""
         data_source = os.getenv("DATA_SOURCE", "bigquery").lower()
         try:
@@ -42,7 +66,8 @@ class Settings:
                 f"Must be one of: {[ds.value for ds in DataSource]}"
             )
     
-    def _get_credentials_path(self) -> Optional[str]:
+    @staticmethod
+    def _get_credentials_path() -> Optional[str]:
         """Get and validate credentials path."""
         creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         if creds_path:
@@ -87,8 +112,14 @@ class Settings:
         except Exception as e:
             raise ValueError(f"Configuration validation failed: {str(e)}")
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings from the environment and .env file once per process."""
+    load_env_file()
+    return Settings.from_env()
+
 # Create a global settings instance
 try:
-    settings = Settings()
+    settings = get_settings()
 except Exception as e:
     raise ValueError(f"Failed to initialize settings: {str(e)}") 
\ No newline at end of file
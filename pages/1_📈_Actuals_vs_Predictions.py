@@ -1,14 +1,19 @@
 import streamlit as st
+import time
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from utils.page_config import set_page_config, add_page_title
-from utils.theme import get_css
-from services.data_source import get_data_source
+from utils.page_config import set_page_config, add_page_title, add_stylesheet, render_metrics
+from utils.theme import get_css, STATIC_CHART_CONFIG
+from services.data_source import get_data_source, MONTH_NAMES
+from utils.sales_calculations import m4_downsample
 from config.settings import settings
 
 # Page configuration
 set_page_config("Actuals vs Predictions")
+add_stylesheet("metrics.css")
 
 # Add title
 st.title("📈 Actuals vs Predictions")
@@ -21,59 +26,122 @@ if 'data_source' not in st.session_state:
         st.error(f"Failed to initialize data source: {str(e)}")
         st.stop()
 
-def load_data(year=None, quarter=None, month=None, week=None):
-    """Load and cache data."""
-    @st.cache_data(ttl=3600, show_spinner=False)
-    def _load_data(y, q, m, w):
-        # Convert month name to number if provided
-        month_num = None
-        if m:
-            month_map = {
-                "January": 1, "February": 2, "March": 3, "April": 4,
-                "May": 5, "June": 6, "July": 7, "August": 8,
-                "September": 9, "October": 10, "November": 11, "December": 12
-            }
-            month_num = month_map.get(m)
-        
-        # Convert quarter to number if provided
-        quarter_num = None
-        if q:
-            quarter_num = int(q[1])  # Extract number from "Q1", "Q2", etc.
-        
-        return st.session_state.data_source.load_dashboard_data(
-            year=y,
-            quarter=quarter_num,
-            month=month_num,
-            week=w,
-            limit=1000
+# Month name -> number, built once
+MONTH_NUMBERS = {name: number for number, name in enumerate(MONTH_NAMES, start=1)}
+
+# Group keys for the monthly and quarterly rollups of the daily totals
+MONTHLY_KEYS = ["year", "quarter", "month"]
+QUARTERLY_KEYS = ["year", "quarter"]
+
+# Sidebar widget options; fixed for the lifetime of the page.
+VIEW_NAMES = ("Daily View", "Monthly View", "Quarterly View")
+YEAR_OPTIONS = (2007, 2008, 2009)
+QUARTER_OPTIONS = ("Q1", "Q2", "Q3", "Q4")
+MONTH_OPTIONS = tuple(MONTH_NAMES)
+
+# Figures kept per session so revisiting a filter combination skips the rebuild
+FIGURE_CACHE_SIZE = 32
+
+def with_calendar_columns(daily):
+    """Add the calendar filter columns used by the views to a daily frame."""
+    dates = daily["date"].dt
+    # Sunday-based week of year, numbered like BigQuery's EXTRACT(WEEK)
+    sunday_weekday = (dates.dayofweek + 1) % 7
+    return daily.assign(
+        year=dates.year.astype("int16"),
+        quarter="Q" + dates.quarter.astype(str),
+        month=dates.month.astype("int8"),
+        week=((dates.dayofyear - 1 + 7 - sunday_weekday) // 7).astype("int8")
+    )
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def _prepare_views():
+    daily_actual, daily_predicted = get_data_source().load_daily_totals()
+    daily_actual = with_calendar_columns(daily_actual)
+    daily_predicted = with_calendar_columns(daily_predicted)
+    
+    views = {"Daily View": (daily_actual, daily_predicted)}
+    # Actual and predicted rollups are independent; pandas groupby releases the GIL
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for view, keys in (("Monthly View", MONTHLY_KEYS), ("Quarterly View", QUARTERLY_KEYS)):
+            views[view] = tuple(executor.map(sum_net_sales, (daily_actual, daily_predicted), (keys, keys)))
+    
+    # Group on the small integer month and attach the label afterwards
+    for df in views["Monthly View"]:
+        df["month_name"] = pd.Categorical.from_codes(
+            df["month"].to_numpy(dtype="int64") - 1,
+            categories=MONTH_NAMES,
+            ordered=True
         )
     
+    # Version token for figures built from these views; unlike id(views) it is
+    # never reused by a later load
+    views["loaded_at"] = time.time_ns()
+    return views
+
+def load_view(view, year=None, quarter=None, month=None, week=None):
+    """
+    Load the (actual, predicted) net sales for one view and filter selection.
+    
+    The daily totals and their monthly and quarterly rollups are computed once
+    per process and shared; each rerun only masks those small frames.
+    """
     with st.spinner("Loading sales data..."):
-        return _load_data(year, quarter, month, week)
+        actual, predicted = _prepare_views()[view]
+    
+    # Convert month name to number if provided
+    month_num = MONTH_NUMBERS.get(month)
+    
+    def select(df):
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in (("year", year), ("quarter", quarter), ("month", month_num), ("week", week)):
+            if value is not None and column in df.columns:
+                mask &= (df[column] == value).to_numpy()
+        return df[mask]
+    
+    return select(actual), select(predicted)
 
-def create_time_series_plot(actual_df, predicted_df, x_col="date", title="Sales Comparison"):
-    """Create a time series plot comparing actual vs predicted values."""
-    # Create line plot for actual values
-    fig = px.line(
-        actual_df,
-        x=x_col,
-        y="net_sales",
-        title=title
-    )
+def sum_net_sales(df, keys):
+    """
+    Sum net sales per key in a single groupby pass.
     
-    # Add predicted values line
-    fig.add_scatter(
-        x=predicted_df[x_col],
-        y=predicted_df["net_sales"],
-        mode="lines",
-        name="Predicted",
-        line=dict(dash="dash")
+    Rows arrive sorted by date, so first-seen group order is already
+    chronological and the key sort can be skipped.
+    """
+    return df.groupby(keys, sort=False, observed=True, as_index=False).agg(
+        net_sales=("net_sales", "sum")
     )
+
+def create_time_series_plot(actual_df, predicted_df, x_col="date", title="Sales Comparison"):
+    """Create a time series plot comparing actual vs predicted values."""
+    # WebGL traces: points are drawn on the GPU instead of laid out as SVG paths.
+    # Plain arrays skip plotly's Series-to-list conversion.
+    fig = go.Figure([
+        go.Scattergl(
+            x=actual_df[x_col].to_numpy(),
+            y=actual_df["net_sales"].to_numpy(),
+            mode="lines",
+            name="Actual"
+        ),
+        go.Scattergl(
+            x=predicted_df[x_col].to_numpy(),
+            y=predicted_df["net_sales"].to_numpy(),
+            mode="lines",
+            name="Predicted",
+            line=dict(dash="dash")
+        )
+    ])
     
     # Update layout
     fig.update_layout(
+        title=title,
         xaxis_title=x_col.title(),
+        # Month/quarter labels are final tick strings; dates keep a date axis
+        xaxis_type="date" if x_col == "date" else "category",
         yaxis_title="Net Sales",
+        # Hover values are formatted in the browser; no per-point strings are shipped
+        hovermode="x unified",
+        yaxis_hoverformat="$,.0f",
         showlegend=True,
         legend=dict(
             yanchor="top",
@@ -85,72 +153,63 @@ def create_time_series_plot(actual_df, predicted_df, x_col="date", title="Sales
     
     return fig
 
-def show_metrics(actual_df, predicted_df):
-    """Display key metrics comparing actual vs predicted values."""
-    actual_total = actual_df["net_sales"].sum()
-    predicted_total = predicted_df["net_sales"].sum()
+def session_figure(key, build):
+    """
+    Return this session's figure for `key`, calling `build()` on first use.
     
+    Only the most recent FIGURE_CACHE_SIZE figures are kept.
+    """
+    figures = st.session_state.setdefault("figures", {})
+    if key in figures:
+        # Re-insert to mark as most recently used
+        figures[key] = figures.pop(key)
+    else:
+        figures[key] = build()
+        if len(figures) > FIGURE_CACHE_SIZE:
+            del figures[next(iter(figures))]
+    return figures[key]
+
+def show_metrics(actual_total, predicted_total):
+    """Display key metrics comparing actual vs predicted sales totals."""
     # Calculate difference and accuracy
     difference = actual_total - predicted_total
     accuracy = (1 - abs(difference) / actual_total) * 100 if actual_total != 0 else 0
     
-    # Create three columns for metrics
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            "Actual Sales",
-            f"${actual_total:,.2f}"
-        )
-    
-    with col2:
-        st.metric(
-            "Predicted Sales",
-            f"${predicted_total:,.2f}"
-        )
-    
-    with col3:
-        st.metric(
-            "Prediction Accuracy",
-            f"{accuracy:.1f}%"
-        )
+    render_metrics({
+        "Actual Sales": f"${actual_total:,.2f}",
+        "Predicted Sales": f"${predicted_total:,.2f}",
+        "Prediction Accuracy": f"{accuracy:.1f}%"
+    })
 
 def main():
     # Create tabs for different time views
-    tab_names = ["Daily View", "Monthly View", "Quarterly View"]
-    current_tab = st.radio("Select View", tab_names, horizontal=True, label_visibility="hidden")
+    current_tab = st.radio("Select View", VIEW_NAMES, horizontal=True, label_visibility="hidden")
     
     # Sidebar filters
     st.sidebar.header("📅 Date Range")
     
-    # Initialize filter values
-    year = None
-    quarter = None
+    # Month and week only apply to the finer-grained views
     month = None
     week = None
     
     # Year selection (always visible)
     year = st.sidebar.selectbox(
         "Year",
-        options=[2007, 2008, 2009],
+        options=YEAR_OPTIONS,
         index=0
     )
     
     # Quarter selection (always visible)
     quarter = st.sidebar.selectbox(
         "Quarter",
-        options=["Q1", "Q2", "Q3", "Q4"]
+        options=QUARTER_OPTIONS
     )
     
     # Month selection (visible for Daily and Monthly views)
-    if current_tab in ["Daily View", "Monthly View"]:
+    if current_tab in ("Daily View", "Monthly View"):
         month = st.sidebar.selectbox(
             "Month",
-            options=[
-                "January", "February", "March", "April",
-                "May", "June", "July", "August",
-                "September", "October", "November", "December"
-            ]
+            options=MONTH_OPTIONS
         )
     
     # Week selection (visible only for Daily view)
@@ -163,34 +222,38 @@ def main():
         )
     
     try:
-        # Load data with filters
-        df_actual, df_predicted = load_data(
+        # Load the aggregated data for the selected view
+        actual, predicted = load_view(
+            current_tab,
             year=year,
             quarter=quarter,
             month=month,
             week=week
         )
         
-        if df_actual.empty:
+        if actual.empty:
             st.warning("No data found for the selected filters.")
             return
         
+        # Totals over the already aggregated view, shared by every tab
+        actual_total = float(actual["net_sales"].to_numpy().sum())
+        predicted_total = float(predicted["net_sales"].to_numpy().sum())
+        # A reloaded views cache carries a new token, which retires old figures
+        figure_key = (_prepare_views()["loaded_at"], current_tab, year, quarter, month, week)
+        
         # Daily View
         if current_tab == "Daily View":
             st.header("📈 Daily Sales Analysis")
             
-            # Daily aggregation
-            daily_actual = df_actual.groupby("date")["net_sales"].sum().reset_index()
-            daily_predicted = df_predicted.groupby("date")["net_sales"].sum().reset_index()
-            
-            show_metrics(daily_actual, daily_predicted)
+            show_metrics(actual_total, predicted_total)
+            fig = session_figure(figure_key, lambda: create_time_series_plot(
+                m4_downsample(actual),
+                m4_downsample(predicted),
+                x_col="date",
+                title="Daily Sales Comparison"
+            ))
             st.plotly_chart(
-                create_time_series_plot(
-                    daily_actual, 
-                    daily_predicted,
-                    x_col="date",
-                    title="Daily Sales Comparison"
-                ),
+                fig,
                 use_container_width=True
             )
         
@@ -198,42 +261,34 @@ def main():
         elif current_tab == "Monthly View":
             st.header("📅 Monthly Sales Analysis")
             
-            # Monthly aggregation
-            monthly_actual = df_actual.groupby(["year", "month", "month_name"])["net_sales"].sum().reset_index()
-            monthly_predicted = df_predicted.groupby(["year", "month", "month_name"])["net_sales"].sum().reset_index()
-            
-            # Sort by month number
-            monthly_actual = monthly_actual.sort_values("month")
-            monthly_predicted = monthly_predicted.sort_values("month")
-            
-            show_metrics(monthly_actual, monthly_predicted)
+            show_metrics(actual_total, predicted_total)
+            fig = session_figure(figure_key, lambda: create_time_series_plot(
+                actual,
+                predicted,
+                x_col="month_name",
+                title="Monthly Sales Comparison"
+            ))
             st.plotly_chart(
-                create_time_series_plot(
-                    monthly_actual,
-                    monthly_predicted,
-                    x_col="month_name",
-                    title="Monthly Sales Comparison"
-                ),
-                use_container_width=True
+                fig,
+                use_container_width=True,
+                config=STATIC_CHART_CONFIG
             )
         
         # Quarterly View
         else:
             st.header("🗓️ Quarterly Sales Analysis")
             
-            # Quarterly aggregation
-            quarterly_actual = df_actual.groupby(["year", "quarter"])["net_sales"].sum().reset_index()
-            quarterly_predicted = df_predicted.groupby(["year", "quarter"])["net_sales"].sum().reset_index()
-            
-            show_metrics(quarterly_actual, quarterly_predicted)
+            show_metrics(actual_total, predicted_total)
+            fig = session_figure(figure_key, lambda: create_time_series_plot(
+                actual,
+                predicted,
+                x_col="quarter",
+                title="Quarterly Sales Comparison"
+            ))
             st.plotly_chart(
-                create_time_series_plot(
-                    quarterly_actual,
-                    quarterly_predicted,
-                    x_col="quarter",
-                    title="Quarterly Sales Comparison"
-                ),
-                use_container_width=True
+                fig,
+                use_container_width=True,
+                config=STATIC_CHART_CONFIG
             )
         
     except Exception as e:
@@ -1,33 +1,47 @@
 import streamlit as st
 import pandas as pd
 import folium
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
 import json
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
 import branca.colormap as cm
-from utils.page_config import set_page_config, add_page_title
-from utils.theme import get_css, get_chart_template
+from utils.page_config import set_page_config, add_page_title, add_stylesheet
+from utils.theme import get_chart_template
 import plotly.graph_objects as go
 import numpy as np
 import calendar
 import plotly.express as px
-from utils.data_loader import initialize_session_state, get_geography_data, load_dashboard_data, get_date_filters
-from utils.geography_calculations import (
-    prepare_geography_data,
-    get_continent_summary,
-    get_country_summary
-)
+from utils.data_loader import initialize_session_state, load_dashboard_data, get_date_filters
+from utils.geography_calculations import prepare_geography_data
 
 # Configure the page
 set_page_config(title="Sales Ninja | Analytics | Geographic Distribution")
 
 # Add CSS and title
-st.markdown(get_css(), unsafe_allow_html=True)
+add_stylesheet("theme.css")
 add_page_title(
     title="Geographic Sales Distribution",
     subtitle="Global Sales Performance by Region",
     emoji="🌍"
 )
 
+# Sales data files; the Parquet copy is preferred when present
+SALES_DATA_PARQUET = 'data/sample_data_geography.parquet'
+SALES_DATA_CSV = 'data/sample_data_geography.csv'
+# Cleaned, typed copy written after the first load; reused while newer than the
+# source and tagged with the current version. Bump the version whenever the
+# cleaning in load_sales_data changes so existing copies are rebuilt.
+SALES_DATA_CLEAN = 'data/sample_data_geography.clean.parquet'
+SALES_DATA_CLEAN_VERSION = b'1'
+CLEAN_VERSION_KEY = b'sales_ninja_clean_version'
+# Source columns the page uses; anything else in the file is never read
+SALES_DATA_COLUMNS = [
+    'DateKey', 'SalesAmount', 'ContinentName', 'RegionCountryName',
+    'CalendarYear', 'CalendarMonth', 'CalendarWeek'
+]
+
 # Define cool color palette at the top of the file
 cool_colors = ["#4169E1", "#9370DB", "#E6E6FA"]  # Royal Blue, Medium Purple, Lavender
 
@@ -43,6 +57,17 @@ def format_currency(value):
     else:
         return f"${value:,.2f}"
 
+def format_currency_array(values):
+    """Format an array of numbers like format_currency, choosing scales in one pass"""
+    values = np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+    scales = [values >= 1e9, values >= 1e6]
+    scaled = np.select(scales, [values / 1e9, values / 1e6], values)
+    suffixes = np.select(scales, ["B", "M"], "")
+    return [
+        f"${value:.2f}{suffix}" if suffix else f"${value:,.2f}"
+        for value, suffix in zip(scaled.tolist(), suffixes.tolist())
+    ]
+
 @st.cache_data
 def get_country_name_mapping():
     """Return mapping of country names to GeoJSON country names"""
@@ -84,29 +109,101 @@ def get_country_name_mapping():
         'Belize': 'Belize'
     }
 
+# Decimal places kept for map coordinates (about 1 km), plenty at world zoom
+GEOJSON_PRECISION = 2
+
+def simplify_ring(ring):
+    """Round a polygon ring's coordinates, dropping points that become repeats"""
+    points = []
+    for lon, lat in ring:
+        point = [round(lon, GEOJSON_PRECISION), round(lat, GEOJSON_PRECISION)]
+        if not points or point != points[-1]:
+            points.append(point)
+    # Tiny islands can collapse below a valid ring; keep those as they were
+    return points if len(points) >= 4 else ring
+
 @st.cache_data
 def load_geojson():
-    """Load and cache the GeoJSON data"""
+    """Load and cache the GeoJSON data, trimmed to country names and map-scale coordinates"""
     try:
         with open('data/world-countries.json', 'r') as f:
-            return json.load(f)
+            geojson_data = json.load(f)
     except FileNotFoundError:
         st.error("Could not find GeoJSON file.")
         return None
+    
+    features = []
+    for feature in geojson_data['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            coordinates = [simplify_ring(ring) for ring in geometry['coordinates']]
+        else:
+            coordinates = [
+                [simplify_ring(ring) for ring in polygon]
+                for polygon in geometry['coordinates']
+            ]
+        features.append({
+            'type': 'Feature',
+            'properties': {'name': feature['properties']['name']},
+            'geometry': {'type': geometry['type'], 'coordinates': coordinates}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+def read_clean_sales_data(source):
+    """Return the cleaned sales frame if a current cleaned copy exists, else None"""
+    try:
+        if os.path.getmtime(SALES_DATA_CLEAN) < os.path.getmtime(source):
+            return None
+        metadata = pq.read_schema(SALES_DATA_CLEAN).metadata or {}
+        if metadata.get(CLEAN_VERSION_KEY) != SALES_DATA_CLEAN_VERSION:
+            return None
+        # Categories and datetimes round-trip through Parquet
+        return pq.read_table(SALES_DATA_CLEAN, memory_map=True).to_pandas(self_destruct=True)
+    except (OSError, ValueError):
+        # Missing, truncated or unreadable: rebuild from the source instead
+        return None
 
-@st.cache_data(ttl=None, show_spinner=True)
+def write_clean_sales_data(df):
+    """Save the cleaned sales frame tagged with its version, replacing any old copy atomically"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        CLEAN_VERSION_KEY: SALES_DATA_CLEAN_VERSION
+    })
+    temp_path = f"{SALES_DATA_CLEAN}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, SALES_DATA_CLEAN)
+    except OSError:
+        # Read-only deployment: keep cleaning on each cold start
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# Cached as a shared resource: every session and rerun gets the same frame by
+# reference instead of unpickling a private copy. Callers must not mutate it.
+@st.cache_resource(show_spinner=True)
 def load_sales_data():
     """Load and prepare sales data"""
     try:
-        df = pd.read_csv('data/sample_data_geography.csv',
-            parse_dates=['DateKey'])
+        source = SALES_DATA_PARQUET if os.path.exists(SALES_DATA_PARQUET) else SALES_DATA_CSV
+        df = read_clean_sales_data(source)
+        if df is not None:
+            return df
         
-        # Clean and prepare data
-        df['RegionCountryName'] = df['RegionCountryName'].str.strip()
+        if source == SALES_DATA_PARQUET:
+            # Memory-mapped read only speeds up loading the file; to_pandas still
+            # copies the data into memory owned by this process
+            df = pq.read_table(
+                SALES_DATA_PARQUET, columns=SALES_DATA_COLUMNS, memory_map=True
+            ).to_pandas(self_destruct=True)
+        else:
+            df = pd.read_csv(SALES_DATA_CSV, usecols=SALES_DATA_COLUMNS, parse_dates=['DateKey'])
         
-        # Map country names
-        country_mapping = get_country_name_mapping()
-        df['country_geojson'] = df['RegionCountryName'].map(country_mapping)
+        # Clean and map country names once per distinct name rather than per
+        # row: Series.map on a categorical only visits its categories
+        countries = df['RegionCountryName'].astype('category').map(str.strip).astype('category')
+        df['RegionCountryName'] = countries
+        df['country_geojson'] = countries.map(get_country_name_mapping())
         df = df[df['country_geojson'].notna()]
         
         # Rename columns
@@ -119,15 +216,54 @@ def load_sales_data():
             'CalendarWeek': 'week'
         })
         
+        # Derived once here so per-rerun filters never add columns to a copy;
+        # the date itself is not needed after that
+        df['quarter'] = df['DateKey'].dt.quarter
+        df = df.drop(columns='DateKey')
+        
+        # A few dozen distinct labels: group on integer codes, not Python strings
+        # (group these columns with observed=True)
+        for col in ['country_geojson', 'country', 'continent']:
+            df[col] = df[col].astype('category').cat.remove_unused_categories()
+        
+        # Single precision is ample for amounts shown to the cent or as $X.XXM,
+        # and halves the bytes every filter and groupby moves
+        df['sales'] = df['sales'].astype('float32')
+        
+        write_clean_sales_data(df)
+        
         return df
         
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
-@st.cache_data
-def get_aggregated_data(df, selected_year=None):
+@st.cache_resource
+def get_location_options():
+    """Sorted continent and country lists for the map filters."""
+    df = load_sales_data()
+    continents = sorted(df['continent'].unique())
+    countries = {
+        continent: sorted(group.unique())
+        for continent, group in df.groupby('continent', observed=True)['country']
+    }
+    countries[None] = sorted(df['country'].unique())
+    return continents, countries
+
+def filter_sales_data(df, selected_continent, selected_countries):
+    """Restrict the sales data to the selected continent and countries"""
+    if selected_continent != "All Continents":
+        df = df[df['continent'] == selected_continent]
+    if selected_countries and "All Countries" not in selected_countries:
+        df = df[df['country'].isin(selected_countries)]
+    return df
+
+# Keyed on the filter selection rather than the frame itself, so a rerun with
+# the same selection neither hashes nor regroups the sales data
+@st.cache_data(show_spinner=False)
+def get_aggregated_data(selected_continent, selected_countries, selected_year=None):
     """Get aggregated data by country"""
+    df = filter_sales_data(load_sales_data(), selected_continent, selected_countries)
     if df is None or len(df) == 0:
         return pd.DataFrame(columns=['country_geojson', 'country', 'continent', 'sales_mean', 'sales_sum'])
     
@@ -135,72 +271,90 @@ def get_aggregated_data(df, selected_year=None):
     if selected_year and selected_year != "All Years":
         df = df[df['year'] == int(selected_year)]
         
-    agg_data = df.groupby(['country_geojson', 'country', 'continent']).agg({
-        'sales': ['mean', 'sum', 'count']
-    }).reset_index()
+    return df.groupby(['country_geojson', 'country', 'continent'], as_index=False, observed=True).agg(
+        sales_mean=('sales', 'mean'),
+        sales_sum=('sales', 'sum'),
+        sales_count=('sales', 'count')
+    )
+
+# Fill colours run from Lavender to Royal Blue
+MAP_COLORS = ['#E6E6FA', '#9370DB', '#6A5ACD', '#4169E1']
+# Map caches are keyed on free-form country selections, so keep only the most recent few
+MAP_CACHE_ENTRIES = 32
+
+@st.cache_data(show_spinner=False, max_entries=MAP_CACHE_ENTRIES)
+def get_map_features(selected_continent, selected_countries, metric='sales_sum'):
+    """Selected countries as one GeoJSON FeatureCollection with fill colour and
+    tooltip values injected, plus the metric range for the legend"""
+    data = get_aggregated_data(selected_continent, selected_countries)
+    sales_values = data[metric].to_numpy()
+    vmin, vmax = (float(sales_values.min()), float(sales_values.max())) if len(sales_values) > 0 else (0, 1)
+    colormap = cm.LinearColormap(colors=MAP_COLORS, vmin=vmin, vmax=vmax)
     
-    # Flatten the column names
-    agg_data.columns = ['country_geojson', 'country', 'continent', 'sales_mean', 'sales_sum', 'sales_count']
-    return agg_data
+    # Create lookup dictionary
+    country_data = data.set_index('country_geojson').to_dict('index')
+    
+    features = []
+    for feature in load_geojson()['features']:
+        country_name = feature['properties']['name']
+        row = country_data.get(country_name)
+        if row is None:
+            continue
+        features.append({
+            'type': 'Feature',
+            'geometry': feature['geometry'],
+            'properties': {
+                'name': country_name,
+                'fill': colormap(row[metric]),
+                'total_sales': format_currency(row['sales_sum']),
+                'average_sales': format_currency(row['sales_mean']),
+                'sales_count': f"{row['sales_count']:,}",
+                'continent': str(row['continent'])
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features}, vmin, vmax
 
-def create_map(data, geojson_data, metric='sales_sum'):
+def create_map(selected_continent, selected_countries, metric='sales_sum'):
     """Create the choropleth map"""
-    if data is None or len(data) == 0:
-        st.warning("No data available for the selected filters.")
+    features, vmin, vmax = get_map_features(selected_continent, selected_countries, metric)
+    if not features['features']:
         return None
         
     m = folium.Map(location=[20, 0], zoom_start=2, scrollWheelZoom=False)
     
     # Create colormap
-    sales_values = data[metric].values
-    if len(sales_values) > 0:
-        vmin = sales_values.min()
-        vmax = sales_values.max()
-    else:
-        vmin = 0
-        vmax = 1
-    
-    colormap = cm.LinearColormap(
-        colors=['#E6E6FA', '#9370DB', '#6A5ACD', '#4169E1'],  # Lavender to Royal Blue gradient
-        vmin=vmin,
-        vmax=vmax
-    )
-    
+    colormap = cm.LinearColormap(colors=MAP_COLORS, vmin=vmin, vmax=vmax)
     colormap.add_to(m)
     colormap.caption = 'Total Sales' if metric == 'sales_sum' else 'Average Sales'
     
-    # Create lookup dictionary
-    country_data = data.set_index('country_geojson').to_dict('index')
-    
-    # Add country polygons
-    for feature in geojson_data['features']:
-        country_name = feature['properties']['name']
-        if country_name in country_data:
-            data = country_data[country_name]
-            color = colormap(data[metric])
-            
-            tooltip = f"""
-            <b>{country_name}</b><br>
-            Total Sales: {format_currency(data['sales_sum'])}<br>
-            Average Sales: {format_currency(data['sales_mean'])}<br>
-            Number of Sales: {data['sales_count']:,}<br>
-            Continent: {data['continent']}
-            """
-            
-            folium.GeoJson(
-                feature,
-                style_function=lambda x, color=color: {
-                    'fillColor': color,
-                    'fillOpacity': 0.7,
-                    'color': 'black',
-                    'weight': 1,
-                    'dashArray': '5, 5'
-                },
-                tooltip=folium.Tooltip(tooltip)
-            ).add_to(m)
+    # One layer for all countries; colours and tooltips come from the properties
+    folium.GeoJson(
+        features,
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['fill'],
+            'fillOpacity': 0.7,
+            'color': 'black',
+            'weight': 1,
+            'dashArray': '5, 5'
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=['name', 'total_sales', 'average_sales', 'sales_count', 'continent'],
+            aliases=['Country:', 'Total Sales:', 'Average Sales:', 'Number of Sales:', 'Continent:']
+        )
+    ).add_to(m)
     
     return m
 
+# Rendering the folium map to HTML dominates each rerun, so the finished page is
+# shared across sessions and reruns for recently seen filter combinations.
+@st.cache_data(show_spinner=False, max_entries=MAP_CACHE_ENTRIES, ttl=3600)
+def build_map_html(selected_continent, selected_countries, metric='sales_sum'):
+    """Render the choropleth map to standalone HTML, or None if there is no data"""
+    m = create_map(selected_continent, selected_countries, metric)
+    if m is None:
+        return None
+    return m.get_root().render()
+
 def create_bar_chart(data, metric='sales_sum', title=None):
     """Create bar chart of sales by country"""
     if data is None or len(data) == 0:
@@ -215,7 +369,7 @@ def create_bar_chart(data, metric='sales_sum', title=None):
             name='Sales',
             x=data['country'],
             y=data[metric],
-            text=[format_currency(val) for val in data[metric]],
+            text=format_currency_array(data[metric]),
             textposition='auto',
         )
     ])
@@ -300,12 +454,216 @@ def create_time_series_chart(data, time_cols, region_col, metric='Total Sales',
     
     return fig
 
+@st.fragment
+def show_time_series(map_df, selected_continent):
+    """Time series section with its own metric and period filters."""
+    region_col = 'country' if selected_continent != "All Continents" else 'continent'
+
+    st.markdown("""<h2 class="table-header">📊 Time Series Analysis</h2>""", unsafe_allow_html=True)
+
+    # Metric selection
+    metric_options = {
+        'sales_sum': 'Total Sales',
+        'sales_mean': 'Average Sales',
+        'sales_count': 'Number of Sales'
+    }
+    selected_metric = st.selectbox(
+        "Select Metric",
+        options=list(metric_options.keys()),
+        format_func=lambda x: metric_options[x],
+        key="time_metric"
+    )
+    time_metric = metric_options[selected_metric]
+
+    # map_df is already filtered by the continent and country selections; this
+    # section only reads and masks it, so no copy is needed
+    time_df = map_df
+
+    # Time filters in a single row
+    time_col1, time_col2, time_col3, time_col4 = st.columns(4)
+
+    # Year selection
+    with time_col1:
+        available_years = sorted(time_df['year'].unique())
+        selected_year = st.selectbox(
+            "Year",
+            options=["All Years"] + available_years,
+            key="time_year"
+        )
+
+    # Filter data by year if selected
+    year_df = time_df
+    if selected_year != "All Years":
+        year_df = time_df[time_df['year'] == int(selected_year)]
+
+    # Quarter selection
+    with time_col2:
+        available_quarters = sorted(year_df['quarter'].unique())
+        selected_quarter = st.selectbox(
+            "Quarter",
+            options=["All Quarters"] + [f"Q{q}" for q in available_quarters],
+            key="time_quarter"
+        )
+
+    # Filter data by quarter if selected and get available months
+    quarter_df = year_df
+    if selected_quarter != "All Quarters":
+        quarter_num = int(selected_quarter[1])
+        quarter_df = year_df[year_df['quarter'] == quarter_num]
+        # Get months for this quarter
+        quarter_months = {
+            1: [1, 2, 3],
+            2: [4, 5, 6],
+            3: [7, 8, 9],
+            4: [10, 11, 12]
+        }
+        available_months = sorted(set(quarter_df['month'].unique()) & set(quarter_months[quarter_num]))
+    else:
+        available_months = sorted(quarter_df['month'].unique())
+
+    # Month selection
+    with time_col3:
+        selected_month = st.selectbox(
+            "Month",
+            options=["All Months"] + [calendar.month_abbr[m] for m in available_months],
+            key="time_month"
+        )
+
+    # Filter data by month if selected and get available weeks; week numbers
+    # only mean something within a year, so skip the scan across all years
+    month_df = quarter_df
+    if selected_month != "All Months":
+        month_num = list(calendar.month_abbr).index(selected_month)
+        month_df = quarter_df[quarter_df['month'] == month_num]
+        available_weeks = sorted(month_df['week'].unique())
+    elif selected_year != "All Years":
+        available_weeks = sorted(quarter_df['week'].unique())
+    else:
+        available_weeks = []
+
+    # Week selection
+    with time_col4:
+        selected_week = st.selectbox(
+            "Week",
+            options=["All Weeks"] + [f"Week {w}" for w in available_weeks],
+            key="time_week"
+        )
+
+    # Final filtering based on week selection
+    if selected_week != "All Weeks":
+        week_num = int(selected_week.split()[1])
+        time_df = month_df[month_df['week'] == week_num]
+    elif selected_month != "All Months":
+        month_num = list(calendar.month_abbr).index(selected_month)
+        time_df = quarter_df[quarter_df['month'] == month_num]
+    elif selected_quarter != "All Quarters":
+        time_df = quarter_df
+    elif selected_year != "All Years":
+        time_df = year_df
+
+    # Only proceed with visualization if we have data
+    if len(time_df) > 0:
+        # Determine x-axis based on selections
+        if selected_week != "All Weeks":
+            x_col = 'week'
+            time_format = lambda x: f"Week {int(x)}"
+            title_period = f"Week {week_num}"
+        elif selected_month != "All Months":
+            x_col = 'month'
+            time_format = lambda x: calendar.month_abbr[int(x)]
+            title_period = selected_month
+        elif selected_quarter != "All Quarters":
+            x_col = 'quarter'
+            time_format = lambda x: f"Q{int(x)}"
+            title_period = selected_quarter
+        else:
+            x_col = 'year'
+            time_format = lambda x: str(int(x))
+            title_period = "Year"
+
+        # Prepare data for visualization
+        if selected_year != "All Years":
+            # If specific year selected, show only that year's data
+            groupby_cols = [x_col]
+            title_year = f" ({selected_year})"
+        else:
+            # If all years, include year in grouping
+            groupby_cols = ['year', x_col] if x_col != 'year' else ['year']
+            title_year = ""
+
+        # Aggregate every region in one pass instead of rescanning per region
+        all_summaries = time_df.groupby([region_col] + groupby_cols, observed=True).agg(
+            sales_mean=('sales', 'mean'),
+            sales_sum=('sales', 'sum'),
+            sales_count=('sales', 'count')
+        )
+
+        # Create a visualization for each region
+        for region, region_summary in all_summaries.groupby(level=0, sort=True, observed=True):
+            region_summary = region_summary.droplevel(0).reset_index()
+
+            # Create x-axis labels
+            if selected_year == "All Years" and x_col != 'year':
+                region_summary['x_label'] = region_summary.apply(
+                    lambda row: f"Y{int(row['year'])}-{time_format(row[x_col])}", axis=1
+                )
+            else:
+                region_summary['x_label'] = region_summary[x_col].apply(time_format)
+
+            # Create bar chart for the region
+            fig = px.bar(
+                region_summary,
+                x='x_label',
+                y=selected_metric,
+                title=f"{time_metric} by {title_period} for {region}{title_year}",
+                labels={
+                    'x_label': title_period,
+                    selected_metric: time_metric
+                },
+                color_discrete_sequence=['#6A5ACD'],  # Slate Blue
+                height=400
+            )
+
+            # Customize layout
+            fig.update_layout(
+                xaxis_title=title_period,
+                yaxis_title=time_metric,
+                plot_bgcolor='rgba(0,0,0,0)',  # Transparent background
+                paper_bgcolor='rgba(0,0,0,0)',  # Transparent surrounding
+                bargap=0.3,  # Adjust gap between bars
+                showlegend=False
+            )
+
+            # Format y-axis for currency values
+            if selected_metric in ['sales_sum', 'sales_mean']:
+                fig.update_layout(
+                    yaxis=dict(
+                        tickformat="$,.0f",
+                        gridcolor='rgba(128,128,128,0.1)'  # Light grid lines
+                    )
+                )
+            else:
+                fig.update_layout(
+                    yaxis=dict(
+                        tickformat=",d",
+                        gridcolor='rgba(128,128,128,0.1)'  # Light grid lines
+                    )
+                )
+
+            # Update x-axis style
+            fig.update_xaxes(
+                gridcolor='rgba(128,128,128,0.1)',  # Light grid lines
+                tickangle=45 if len(region_summary) > 6 else 0  # Angle labels only if many bars
+            )
+
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("No data available for the selected filters.")
+        st.warning("Need both promotional and non-promotional data for comparison. Current distribution:\n\nPromotional transactions: 5\nNon-promotional transactions: 0\nUnable to calculate promotional impact. Please check the data or filters.")
+
 # Initialize session state
 initialize_session_state()
 
-# Get the synthetic geography data
-map_df = get_geography_data()
-
 # Load Data
 sales_df = load_sales_data()
 if sales_df is None:
@@ -325,7 +683,7 @@ st.markdown("""<h2 class="table-header">🗺️ Sales Distribution Map</h2>""",
 map_col1, map_col2 = st.columns(2)
 
 with map_col1:
-    available_continents = sorted(sales_df['continent'].unique())
+    available_continents, countries_by_continent = get_location_options()
     selected_continent = st.selectbox(
         "Select Continent",
         ["All Continents"] + available_continents,
@@ -334,9 +692,9 @@ with map_col1:
 
 with map_col2:
     if selected_continent != "All Continents":
-        available_countries = sorted(sales_df[sales_df['continent'] == selected_continent]['country'].unique())
+        available_countries = countries_by_continent[selected_continent]
     else:
-        available_countries = sorted(sales_df['country'].unique())
+        available_countries = countries_by_continent[None]
     
     selected_countries = st.multiselect(
         "Select Countries",
@@ -354,21 +712,18 @@ map_metric = st.radio(
 )
 
 # Filter data for map and summary
-map_df = sales_df.copy()
-
-if selected_continent != "All Continents":
-    map_df = map_df[map_df['continent'] == selected_continent]
-if selected_countries and "All Countries" not in selected_countries:
-    map_df = map_df[map_df['country'].isin(selected_countries)]
+map_df = filter_sales_data(sales_df, selected_continent, selected_countries)
 
 # Aggregate data for both map and summary
-map_aggregated_data = get_aggregated_data(map_df)
+map_aggregated_data = get_aggregated_data(selected_continent, selected_countries)
 metric_col = 'sales_sum' if map_metric == "Total Sales" else 'sales_mean'
 
 # Display map
-m = create_map(map_aggregated_data, geojson_data, metric=metric_col)
-if m is not None:
-    folium_static(m, width=1200)
+map_html = build_map_html(selected_continent, selected_countries, metric=metric_col)
+if map_html is None:
+    st.warning("No data available for the selected filters.")
+else:
+    components.html(map_html, width=1200, height=510)
 
 # 2. Summary Section
 st.markdown("""<h2 class="table-header">📊 Sales Summary</h2>""", unsafe_allow_html=True)
@@ -376,22 +731,22 @@ st.markdown("""<h2 class="table-header">📊 Sales Summary</h2>""", unsafe_allow
 if len(map_aggregated_data) > 0:
     # Create summary based on selected filters
     if selected_continent != "All Continents":
-        summary = map_aggregated_data.groupby('country').agg({
+        summary = map_aggregated_data.groupby('country', as_index=False, observed=True).agg({
             'sales_mean': 'mean',
             'sales_sum': 'sum',
             'sales_count': 'sum'
-        }).reset_index()
+        })
         summary.columns = ['Country', 'Average Sales', 'Total Sales', 'Number of Sales']
     else:
-        summary = map_aggregated_data.groupby('continent').agg({
+        summary = map_aggregated_data.groupby('continent', as_index=False, observed=True).agg({
             'sales_mean': 'mean',
             'sales_sum': 'sum',
             'sales_count': 'sum'
-        }).reset_index()
+        })
         summary.columns = ['Continent', 'Average Sales', 'Total Sales', 'Number of Sales']
 
-    summary['Average Sales'] = summary['Average Sales'].apply(format_currency)
-    summary['Total Sales'] = summary['Total Sales'].apply(format_currency)
+    summary['Average Sales'] = format_currency_array(summary['Average Sales'])
+    summary['Total Sales'] = format_currency_array(summary['Total Sales'])
     summary['Number of Sales'] = summary['Number of Sales'].apply(lambda x: f"{x:,}")
 
     # Display summary table
@@ -508,219 +863,73 @@ if len(map_aggregated_data) > 0:
 
     st.plotly_chart(fig, use_container_width=True)
 
-    # Time Analysis Section
-    st.markdown("""<h2 class="table-header">📊 Time Series Analysis</h2>""", unsafe_allow_html=True)
+    # Time series widgets rerun only this fragment, not the map above
+    show_time_series(map_df, selected_continent)
 
-    # Metric selection
-    metric_options = {
-        'sales_sum': 'Total Sales',
-        'sales_mean': 'Average Sales',
-        'sales_count': 'Number of Sales'
-    }
-    selected_metric = st.selectbox(
-        "Select Metric",
-        options=list(metric_options.keys()),
-        format_func=lambda x: metric_options[x],
-        key="time_metric"
-    )
-    time_metric = metric_options[selected_metric]
+@st.fragment
+def show_country_analysis(geo_data):
+    """Country analysis section; its continent filter reruns only this section."""
+    st.header("🗺️ Country Analysis")
 
-    # Start with data filtered by continent and country selections
-    time_df = map_df.copy()
-    if selected_continent != "All Continents":
-        time_df = time_df[time_df['continent'] == selected_continent]
-    if selected_countries and "All Countries" not in selected_countries:
-        time_df = time_df[time_df['country'].isin(selected_countries)]
-
-    # Calculate quarter from DateKey
-    time_df['quarter'] = time_df['DateKey'].dt.quarter
-
-    # Time filters in a single row
-    time_col1, time_col2, time_col3, time_col4 = st.columns(4)
-
-    # Year selection
-    with time_col1:
-        available_years = sorted(time_df['year'].unique())
-        selected_year = st.selectbox(
-            "Year",
-            options=["All Years"] + available_years,
-            key="time_year"
-        )
-
-    # Filter data by year if selected
-    year_df = time_df
-    if selected_year != "All Years":
-        year_df = time_df[time_df['year'] == int(selected_year)]
-
-    # Quarter selection
-    with time_col2:
-        available_quarters = sorted(year_df['quarter'].unique())
-        selected_quarter = st.selectbox(
-            "Quarter",
-            options=["All Quarters"] + [f"Q{q}" for q in available_quarters],
-            key="time_quarter"
-        )
-
-    # Filter data by quarter if selected and get available months
-    quarter_df = year_df
-    if selected_quarter != "All Quarters":
-        quarter_num = int(selected_quarter[1])
-        quarter_df = year_df[year_df['quarter'] == quarter_num]
-        # Get months for this quarter
-        quarter_months = {
-            1: [1, 2, 3],
-            2: [4, 5, 6],
-            3: [7, 8, 9],
-            4: [10, 11, 12]
-        }
-        available_months = sorted(set(quarter_df['month'].unique()) & set(quarter_months[quarter_num]))
-    else:
-        available_months = sorted(quarter_df['month'].unique())
+    # Filter by continent
+    selected_continent = st.selectbox(
+        "Select Continent",
+        options=['All'] + sorted(geo_data['continent'].unique().tolist())
+    )
 
-    # Month selection
-    with time_col3:
-        selected_month = st.selectbox(
-            "Month",
-            options=["All Months"] + [calendar.month_abbr[m] for m in available_months],
-            key="time_month"
+    # Country comparison
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Top Countries by Sales
+        fig_countries = px.bar(
+            geo_data[geo_data['continent'] == selected_continent] if selected_continent != 'All' else geo_data,
+            x='country',
+            y='net_sales_sum',
+            title=f"Top Countries by Sales ({selected_continent})",
+            labels={'country': 'Country', 'net_sales_sum': 'Total Sales ($)'}
         )
-
-    # Filter data by month if selected and get available weeks
-    month_df = quarter_df
-    if selected_month != "All Months":
-        month_num = list(calendar.month_abbr).index(selected_month)
-        month_df = quarter_df[quarter_df['month'] == month_num]
-        available_weeks = sorted(month_df['week'].unique())
-    else:
-        available_weeks = sorted(quarter_df['week'].unique())
-
-    # Week selection
-    with time_col4:
-        selected_week = st.selectbox(
-            "Week",
-            options=["All Weeks"] + [f"Week {w}" for w in available_weeks],
-            key="time_week"
+        st.plotly_chart(fig_countries, use_container_width=True)
+
+    with col2:
+        # Sales vs Returns Scatter
+        fig_scatter = px.scatter(
+            geo_data[geo_data['continent'] == selected_continent] if selected_continent != 'All' else geo_data,
+            x='net_sales_sum',
+            y='return_rate',
+            text='country',
+            title=f"Sales vs Return Rate ({selected_continent})",
+            labels={
+                'net_sales_sum': 'Total Sales ($)',
+                'return_rate': 'Return Rate (%)'
+            }
         )
+        st.plotly_chart(fig_scatter, use_container_width=True)
 
-    # Final filtering based on week selection
-    if selected_week != "All Weeks":
-        week_num = int(selected_week.split()[1])
-        time_df = month_df[month_df['week'] == week_num]
-    elif selected_month != "All Months":
-        month_num = list(calendar.month_abbr).index(selected_month)
-        time_df = quarter_df[quarter_df['month'] == month_num]
-    elif selected_quarter != "All Quarters":
-        time_df = quarter_df
-    elif selected_year != "All Years":
-        time_df = year_df
-
-    # Only proceed with visualization if we have data
-    if len(time_df) > 0:
-        # Determine x-axis based on selections
-        if selected_week != "All Weeks":
-            x_col = 'week'
-            time_format = lambda x: f"Week {int(x)}"
-            title_period = f"Week {week_num}"
-        elif selected_month != "All Months":
-            x_col = 'month'
-            time_format = lambda x: calendar.month_abbr[int(x)]
-            title_period = selected_month
-        elif selected_quarter != "All Quarters":
-            x_col = 'quarter'
-            time_format = lambda x: f"Q{int(x)}"
-            title_period = selected_quarter
-        else:
-            x_col = 'year'
-            time_format = lambda x: str(int(x))
-            title_period = "Year"
-
-        # Get unique regions
-        regions = sorted(time_df[region_col].unique())
+    # Detailed Metrics Table
+    st.subheader("Detailed Metrics by Country")
+    detailed_metrics = geo_data.copy()
+    detailed_metrics['net_sales_sum'] = detailed_metrics['net_sales_sum'].map('${:,.2f}'.format)
+    detailed_metrics['net_sales_mean'] = detailed_metrics['net_sales_mean'].map('${:,.2f}'.format)
+    detailed_metrics['return_rate'] = detailed_metrics['return_rate'].map('{:.1f}%'.format)
+    detailed_metrics['discount_rate'] = detailed_metrics['discount_rate'].map('{:.1f}%'.format)
 
-        # Create a visualization for each region
-        for region in regions:
-            # Filter data for the current region
-            region_df = time_df[time_df[region_col] == region]
-            
-            # Prepare data for visualization
-            if selected_year != "All Years":
-                # If specific year selected, show only that year's data
-                groupby_cols = [x_col]
-                title_year = f" ({selected_year})"
-            else:
-                # If all years, include year in grouping
-                groupby_cols = ['year', x_col] if x_col != 'year' else ['year']
-                title_year = ""
-
-            # Aggregate data
-            region_summary = region_df.groupby(groupby_cols).agg({
-                'sales': ['mean', 'sum', 'count']
-            }).reset_index()
-
-            # Flatten column names
-            if len(groupby_cols) > 1:
-                region_summary.columns = groupby_cols + ['sales_mean', 'sales_sum', 'sales_count']
-            else:
-                region_summary.columns = [groupby_cols[0], 'sales_mean', 'sales_sum', 'sales_count']
+    if selected_continent != 'All':
+        detailed_metrics = detailed_metrics[detailed_metrics['continent'] == selected_continent]
 
-            # Create x-axis labels
-            if selected_year == "All Years" and x_col != 'year':
-                region_summary['x_label'] = region_summary.apply(
-                    lambda row: f"Y{int(row['year'])}-{time_format(row[x_col])}", axis=1
-                )
-            else:
-                region_summary['x_label'] = region_summary[x_col].apply(time_format)
-
-            # Create bar chart for the region
-            fig = px.bar(
-                region_summary,
-                x='x_label',
-                y=selected_metric,
-                title=f"{time_metric} by {title_period} for {region}{title_year}",
-                labels={
-                    'x_label': title_period,
-                    selected_metric: time_metric
-                },
-                color_discrete_sequence=['#6A5ACD'],  # Slate Blue
-                height=400
-            )
-
-            # Customize layout
-            fig.update_layout(
-                xaxis_title=title_period,
-                yaxis_title=time_metric,
-                plot_bgcolor='rgba(0,0,0,0)',  # Transparent background
-                paper_bgcolor='rgba(0,0,0,0)',  # Transparent surrounding
-                bargap=0.3,  # Adjust gap between bars
-                showlegend=False
-            )
-
-            # Format y-axis for currency values
-            if selected_metric in ['sales_sum', 'sales_mean']:
-                fig.update_layout(
-                    yaxis=dict(
-                        tickformat="$,.0f",
-                        gridcolor='rgba(128,128,128,0.1)'  # Light grid lines
-                    )
-                )
-            else:
-                fig.update_layout(
-                    yaxis=dict(
-                        tickformat=",d",
-                        gridcolor='rgba(128,128,128,0.1)'  # Light grid lines
-                    )
-                )
-
-            # Update x-axis style
-            fig.update_xaxes(
-                gridcolor='rgba(128,128,128,0.1)',  # Light grid lines
-                tickangle=45 if len(region_summary) > 6 else 0  # Angle labels only if many bars
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No data available for the selected filters.")
-        st.warning("Need both promotional and non-promotional data for comparison. Current distribution:\n\nPromotional transactions: 5\nNon-promotional transactions: 0\nUnable to calculate promotional impact. Please check the data or filters.")
+    st.dataframe(
+        detailed_metrics,
+        column_config={
+            'country': 'Country',
+            'continent': 'Continent',
+            'net_sales_sum': 'Total Sales',
+            'net_sales_mean': 'Average Sales',
+            'SalesQuantity_sum': 'Units Sold',
+            'return_rate': 'Return Rate',
+            'discount_rate': 'Discount Rate'
+        },
+        hide_index=True
+    )
 
 def main():
     try:
@@ -740,9 +949,6 @@ def main():
         # Display summary metrics
         st.header("📊 Sales by Geography")
         
-        # Continent Overview
-        continent_data = get_continent_summary(df_actual)
-        
         # Create continent map
         fig_continent = px.choropleth(
             geo_data,
@@ -788,73 +994,7 @@ def main():
             st.plotly_chart(fig_returns, use_container_width=True)
         
         # Country Analysis
-        st.header("🗺️ Country Analysis")
-        
-        # Filter by continent
-        selected_continent = st.selectbox(
-            "Select Continent",
-            options=['All'] + sorted(geo_data['continent'].unique().tolist())
-        )
-        
-        # Get country data
-        country_data = get_country_summary(
-            df_actual,
-            None if selected_continent == 'All' else selected_continent
-        )
-        
-        # Country comparison
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Top Countries by Sales
-            fig_countries = px.bar(
-                geo_data[geo_data['continent'] == selected_continent] if selected_continent != 'All' else geo_data,
-                x='country',
-                y='net_sales_sum',
-                title=f"Top Countries by Sales ({selected_continent})",
-                labels={'country': 'Country', 'net_sales_sum': 'Total Sales ($)'}
-            )
-            st.plotly_chart(fig_countries, use_container_width=True)
-        
-        with col2:
-            # Sales vs Returns Scatter
-            fig_scatter = px.scatter(
-                geo_data[geo_data['continent'] == selected_continent] if selected_continent != 'All' else geo_data,
-                x='net_sales_sum',
-                y='return_rate',
-                text='country',
-                title=f"Sales vs Return Rate ({selected_continent})",
-                labels={
-                    'net_sales_sum': 'Total Sales ($)',
-                    'return_rate': 'Return Rate (%)'
-                }
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
-        
-        # Detailed Metrics Table
-        st.subheader("Detailed Metrics by Country")
-        detailed_metrics = geo_data.copy()
-        detailed_metrics['net_sales_sum'] = detailed_metrics['net_sales_sum'].map('${:,.2f}'.format)
-        detailed_metrics['net_sales_mean'] = detailed_metrics['net_sales_mean'].map('${:,.2f}'.format)
-        detailed_metrics['return_rate'] = detailed_metrics['return_rate'].map('{:.1f}%'.format)
-        detailed_metrics['discount_rate'] = detailed_metrics['discount_rate'].map('{:.1f}%'.format)
-        
-        if selected_continent != 'All':
-            detailed_metrics = detailed_metrics[detailed_metrics['continent'] == selected_continent]
-        
-        st.dataframe(
-            detailed_metrics,
-            column_config={
-                'country': 'Country',
-                'continent': 'Continent',
-                'net_sales_sum': 'Total Sales',
-                'net_sales_mean': 'Average Sales',
-                'SalesQuantity_sum': 'Units Sold',
-                'return_rate': 'Return Rate',
-                'discount_rate': 'Discount Rate'
-            },
-            hide_index=True
-        )
+        show_country_analysis(geo_data)
     
     except Exception as e:
         st.error(f"Error loading or processing data: {str(e)}")
@@ -4,12 +4,15 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from utils.page_config import set_page_config, add_page_title
+from utils.page_config import set_page_config, add_page_title, add_stylesheet, render_metrics
 from utils.data_queries import get_daily_sales, get_kpi_metrics, get_promotion_impact
-from google.cloud import bigquery
+from utils.sales_calculations import m4_downsample
+from utils.theme import STATIC_CHART_CONFIG
 
 # Configure the page
 set_page_config(title="Dashboard")
+add_stylesheet("dashboard.css")
+add_stylesheet("metrics.css")
 
 # Add the styled title
 add_page_title(
@@ -27,8 +30,63 @@ COLOR_SCHEME = {
     'background': 'rgba(25, 25, 112, 0.1)'  # Midnight Blue with opacity
 }
 
-# Initialize BigQuery client
-client = bigquery.Client()
+# Query results are held across reruns; only a new date range hits BigQuery
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_dashboard_frames(start_date, end_date):
+    """Load the daily sales, KPI and promotion frames for a date range."""
+    return (
+        get_daily_sales(start_date, end_date),
+        get_kpi_metrics(start_date, end_date),
+        get_promotion_impact(start_date, end_date)
+    )
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def format_kpis(start_date, end_date):
+    """KPI label -> display string for a date range, formatted once per range."""
+    _, kpi_data, _ = load_dashboard_frames(start_date, end_date)
+    kpis = kpi_data.iloc[0]
+    return {
+        "Total Net Sales": f"${kpis['total_net_sales']:,.2f}",
+        "Total Sales Volume": f"{kpis['total_volume']:,.0f}",
+        "Total Transactions": f"{kpis['total_transactions']:,.0f}",
+        "Avg Transaction Value": f"${kpis['avg_transaction_value']:,.2f}"
+    }
+
+# Static styling for the time series chart, built and validated once at import
+NET_SALES_LINE = dict(color='#2B4C7E', width=2)  # Dark Blue
+VOLUME_LINE = dict(color='#4A78B3', width=2)  # Medium Blue
+TIME_SERIES_LAYOUT = go.Layout(
+    title='Net Sales and Volume Over Time',
+    xaxis=dict(
+        title='Date',
+        gridcolor='rgba(74, 120, 179, 0.1)',  # Medium Blue with opacity
+        title_font_color='#2B4C7E'
+    ),
+    yaxis=dict(
+        title=dict(text='Net Sales ($)', font=dict(color='#2B4C7E')),
+        tickfont=dict(color='#2B4C7E'),
+        gridcolor='rgba(74, 120, 179, 0.1)'
+    ),
+    yaxis2=dict(
+        title=dict(text='Sales Volume', font=dict(color='#4A78B3')),
+        tickfont=dict(color='#4A78B3'),
+        overlaying='y',
+        side='right',
+        gridcolor='rgba(74, 120, 179, 0.1)'
+    ),
+    plot_bgcolor='#E6EEF8',  # Light Blue
+    paper_bgcolor='#F8FAFC',  # Very Light Blue
+    height=500,
+    showlegend=True,
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1,
+        font=dict(color='#2B4C7E')
+    )
+)
 
 # Dashboard Title
 st.markdown("""<h1 class="dashboard-header">Sales Performance Dashboard</h1>""", unsafe_allow_html=True)
@@ -40,203 +98,121 @@ with col1:
 with col2:
     end_date = st.date_input("End Date", datetime(2009, 12, 31))
 
+# Get data from BigQuery; failed loads are not cached, so the next rerun retries
 try:
-    # Get data from BigQuery
-    filtered_data = get_daily_sales(start_date, end_date)
-    kpi_data = get_kpi_metrics(start_date, end_date)
-    promo_data = get_promotion_impact(start_date, end_date)
-
-    # Update KPI metrics styling
-    st.markdown("""
-        <div style="
-            background: linear-gradient(135deg, #A8C4E9, #E0D3ED);
-            padding: 20px;
-            border-radius: 10px;
-            margin: 10px 0;
-            border: 2px solid #4A78B3;
-            box-shadow: 0 2px 6px rgba(74, 120, 179, 0.2);
-        ">
-        <h2 class="metric-header">Key Performance Indicators</h2>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Display KPIs in columns
-    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-
-    with kpi1:
-        st.metric("Total Net Sales", f"${kpi_data['total_net_sales'].iloc[0]:,.2f}")
-    with kpi2:
-        st.metric("Total Sales Volume", f"{kpi_data['total_volume'].iloc[0]:,.0f}")
-    with kpi3:
-        st.metric("Total Transactions", f"{kpi_data['total_transactions'].iloc[0]:,.0f}")
-    with kpi4:
-        st.metric("Avg Transaction Value", f"${kpi_data['avg_transaction_value'].iloc[0]:,.2f}")
-
-    # Promotional Impact Analysis
-    st.markdown("""
-        <div style="
-            background: linear-gradient(135deg, #A8C4E9, #E0D3ED);
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            border: 2px solid #4A78B3;
-            box-shadow: 0 2px 6px rgba(74, 120, 179, 0.2);
-        ">
-        <h2 class="analysis-header">Promotional Impact Analysis</h2>
-        </div>
-    """, unsafe_allow_html=True)
-
-    # Calculate promotional impact
-    promo_metrics = []
-    for metric in ['total_sales', 'avg_sale_value', 'total_volume', 'avg_volume', 'transaction_count']:
-        promo_val = promo_data[promo_data['has_promotion']][metric].iloc[0]
-        non_promo_val = promo_data[~promo_data['has_promotion']][metric].iloc[0]
-        lift = ((promo_val - non_promo_val) / non_promo_val) * 100
-        promo_metrics.append({
-            'Metric': metric.replace('_', ' ').title(),
-            'Promotional': promo_val,
-            'Non-Promotional': non_promo_val,
-            'Lift %': lift
-        })
-
-    promo_impact = pd.DataFrame(promo_metrics)
-
-    # Display promotional metrics
-    col1, col2 = st.columns(2)
-
-    with col1:
-        # Create comparison table
-        fig_table = go.Figure(data=[go.Table(
-            header=dict(
-                values=['Metric', 'Promotional', 'Non-Promotional'],
-                fill_color='rgba(255, 140, 0, 0.1)',
-                align='left'
-            ),
-            cells=dict(
-                values=[
-                    promo_impact['Metric'],
-                    promo_impact['Promotional'].apply(lambda x: f"${x:,.2f}" if 'value' in str(promo_impact['Metric']).lower() else f"{x:,.0f}"),
-                    promo_impact['Non-Promotional'].apply(lambda x: f"${x:,.2f}" if 'value' in str(promo_impact['Metric']).lower() else f"{x:,.0f}")
-                ],
-                align='left'
-            )
-        )])
-        st.plotly_chart(fig_table, use_container_width=True)
-
-    with col2:
-        # Display impact metrics
-        st.markdown("### Promotional Lift")
-        for idx, row in promo_impact.iterrows():
-            st.metric(
-                row['Metric'],
-                f"{row['Lift %']:+.2f}%",
-                delta_color="normal"
-            )
-
-    # Time Series Analysis
-    st.markdown("""<h2 class="analysis-header">Time Series Analysis</h2>""", unsafe_allow_html=True)
-
-    # Create time series plots
-    fig_time = go.Figure()
-
-    # Update the time series chart colors
-    fig_time.add_trace(go.Scatter(
-        x=filtered_data['date'],
-        y=filtered_data['total_net_sales'],
-        name='Net Sales',
-        line=dict(color='#2B4C7E', width=2)  # Dark Blue
-    ))
-
-    fig_time.add_trace(go.Scatter(
-        x=filtered_data['date'],
-        y=filtered_data['total_volume'],
-        name='Sales Volume',
-        line=dict(color='#4A78B3', width=2),  # Medium Blue
-        yaxis='y2'
-    ))
-
-    fig_time.update_layout(
-        title='Net Sales and Volume Over Time',
-        xaxis=dict(
-            title='Date',
-            gridcolor='rgba(74, 120, 179, 0.1)',  # Medium Blue with opacity
-            title_font_color='#2B4C7E'
-        ),
-        yaxis=dict(
-            title='Net Sales ($)',
-            titlefont=dict(color='#2B4C7E'),
-            tickfont=dict(color='#2B4C7E'),
-            gridcolor='rgba(74, 120, 179, 0.1)'
-        ),
-        yaxis2=dict(
-            title='Sales Volume',
-            titlefont=dict(color='#4A78B3'),
-            tickfont=dict(color='#4A78B3'),
-            overlaying='y',
-            side='right',
-            gridcolor='rgba(74, 120, 179, 0.1)'
-        ),
-        plot_bgcolor='#E6EEF8',  # Light Blue
-        paper_bgcolor='#F8FAFC',  # Very Light Blue
-        height=500,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(color='#2B4C7E')
-        )
-    )
-
-    st.plotly_chart(fig_time, use_container_width=True)
-
+    with st.spinner("Loading sales data..."):
+        filtered_data, _, promo_data = load_dashboard_frames(start_date, end_date)
+        kpi_values = format_kpis(start_date, end_date)
 except Exception as e:
     st.error(f"Error loading dashboard data: {str(e)}")
     st.info("Please check your BigQuery connection and try again.")
+    st.stop()
 
-# Update the CSS styling
+# Update KPI metrics styling
 st.markdown("""
-    <style>
-    .dashboard-header {
-        background: linear-gradient(45deg, #4169E1, #9370DB);  /* Royal Blue to Medium Purple */
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 2.5em;
-        font-weight: bold;
-        margin-bottom: 1em;
-        text-align: center;
+    <div style="
+        background: linear-gradient(135deg, #A8C4E9, #E0D3ED);
         padding: 20px;
-    }
-    .metric-header, .analysis-header {
-        color: #4169E1;  /* Royal Blue */
-        font-size: 1.8em;
-        margin-top: 1em;
-        margin-bottom: 0.5em;
-        border-left: 5px solid #9370DB;  /* Medium Purple */
-        padding-left: 10px;
-    }
-    div[data-testid="stMetricValue"] {
-        color: #4169E1 !important;  /* Royal Blue */
-        font-weight: bold;
-    }
-    div[data-testid="stMetricLabel"] {
-        color: #9370DB !important;  /* Medium Purple */
-    }
-    div[data-testid="stMetricDelta"] {
-        color: #E6E6FA !important;  /* Lavender */
-    }
-    div[data-testid="stHorizontalBlock"] > div {
-        background-color: rgba(25, 25, 112, 0.1);  /* Midnight Blue with opacity */
         border-radius: 10px;
-        padding: 10px !important;
-        border: 1px solid rgba(147, 112, 219, 0.2);  /* Medium Purple with opacity */
-    }
-    div[data-testid="stHorizontalBlock"] > div:hover {
-        box-shadow: 0 0 10px rgba(147, 112, 219, 0.2);  /* Medium Purple with opacity */
-        transform: translateY(-2px);
-        transition: all 0.3s ease;
-    }
-    </style>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+        margin: 10px 0;
+        border: 2px solid #4A78B3;
+        box-shadow: 0 2px 6px rgba(74, 120, 179, 0.2);
+    ">
+    <h2 class="metric-header">Key Performance Indicators</h2>
+    </div>
+""", unsafe_allow_html=True)
+
+# Display KPIs as a single row element
+render_metrics(kpi_values)
+
+# Promotional Impact Analysis
+st.markdown("""
+    <div style="
+        background: linear-gradient(135deg, #A8C4E9, #E0D3ED);
+        padding: 20px;
+        border-radius: 10px;
+        margin: 20px 0;
+        border: 2px solid #4A78B3;
+        box-shadow: 0 2px 6px rgba(74, 120, 179, 0.2);
+    ">
+    <h2 class="analysis-header">Promotional Impact Analysis</h2>
+    </div>
+""", unsafe_allow_html=True)
+
+# Calculate promotional impact: split the two groups once, then compare all metrics together
+metrics = ['total_sales', 'avg_sale_value', 'total_volume', 'avg_volume', 'transaction_count']
+is_promo = promo_data['has_promotion'].to_numpy(dtype=bool)
+metric_values = promo_data[metrics].to_numpy(dtype=float)
+promo_vals = metric_values[is_promo][0]
+non_promo_vals = metric_values[~is_promo][0]
+
+promo_impact = pd.DataFrame({
+    'Metric': [metric.replace('_', ' ').title() for metric in metrics],
+    'Promotional': promo_vals,
+    'Non-Promotional': non_promo_vals,
+    'Lift %': (promo_vals - non_promo_vals) / non_promo_vals * 100
+})
+
+# Display promotional metrics
+col1, col2 = st.columns(2)
+
+with col1:
+    # Create comparison table
+    fig_table = go.Figure(data=[go.Table(
+        header=dict(
+            values=['Metric', 'Promotional', 'Non-Promotional'],
+            fill_color='rgba(255, 140, 0, 0.1)',
+            align='left'
+        ),
+        cells=dict(
+            values=[
+                promo_impact['Metric'],
+                promo_impact['Promotional'].apply(lambda x: f"${x:,.2f}" if 'value' in str(promo_impact['Metric']).lower() else f"{x:,.0f}"),
+                promo_impact['Non-Promotional'].apply(lambda x: f"${x:,.2f}" if 'value' in str(promo_impact['Metric']).lower() else f"{x:,.0f}")
+            ],
+            align='left'
+        )
+    )])
+    st.plotly_chart(fig_table, use_container_width=True, config=STATIC_CHART_CONFIG)
+
+with col2:
+    # Display impact metrics
+    st.markdown("### Promotional Lift")
+    for idx, row in promo_impact.iterrows():
+        st.metric(
+            row['Metric'],
+            f"{row['Lift %']:+.2f}%",
+            delta_color="normal"
+        )
+
+# Time Series Analysis
+st.markdown("""<h2 class="analysis-header">Time Series Analysis</h2>""", unsafe_allow_html=True)
+
+# Create time series plots; long ranges are reduced to what the chart can draw
+net_sales_points = m4_downsample(filtered_data, y='total_net_sales')
+volume_points = m4_downsample(filtered_data, y='total_volume')
+
+# Plain dict traces on the prebuilt layout are validated once by the Figure
+# constructor instead of per add_trace call; WebGL traces draw on the GPU
+fig_time = go.Figure(
+    data=[
+        dict(
+            type='scattergl',
+            x=net_sales_points['date'].to_numpy(),
+            y=net_sales_points['total_net_sales'].to_numpy(),
+            name='Net Sales',
+            line=NET_SALES_LINE
+        ),
+        dict(
+            type='scattergl',
+            x=volume_points['date'].to_numpy(),
+            y=volume_points['total_volume'].to_numpy(),
+            name='Sales Volume',
+            line=VOLUME_LINE,
+            yaxis='y2'
+        )
+    ],
+    layout=TIME_SERIES_LAYOUT
+)
+
+st.plotly_chart(fig_time, use_container_width=True)
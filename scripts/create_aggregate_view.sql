@@ -0,0 +1,23 @@
+-- Daily x product category x store rollup of the actuals table.
+--
+-- The dashboard reads its category and store totals from this view, so a
+-- cache miss scans a few thousand pre-aggregated rows instead of the full
+-- dashboard_merged_data table. BigQuery keeps the view up to date
+-- incrementally as the base table changes.
+--
+-- Run once per dataset:
+--   bq query --use_legacy_sql=false < scripts/create_aggregate_view.sql
+-- The view name must match BQ_AGGREGATE_VIEW (default: daily_category_store_agg).
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboard_data.daily_category_store_agg
+OPTIONS (enable_refresh = true, refresh_interval_minutes = 60)
+AS
+SELECT
+    DateKey,
+    ProductCategoryName,
+    StoreName,
+    StoreType,
+    SUM(SalesAmount) AS net_sales,
+    SUM(SalesQuantity) AS SalesQuantity
+FROM dashboard_data.dashboard_merged_data
+GROUP BY DateKey, ProductCategoryName, StoreName, StoreType;
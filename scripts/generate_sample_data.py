@@ -138,8 +138,9 @@ for country in df['RegionCountryName'].unique():
 # Round final sales amounts
 df['SalesAmount'] = df['SalesAmount'].round(2)
 
-# Save to CSV
+# Save to CSV, plus a Parquet copy that the dashboard can memory-map
 df.to_csv('data/sample_data_geography.csv', index=False)
+df.to_parquet('data/sample_data_geography.parquet', compression='zstd', row_group_size=100_000, index=False)
 
 # Print summary statistics
 print("Sample data generated successfully!")
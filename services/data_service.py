@@ -1,13 +1,18 @@
+import asyncio
 from google.cloud import bigquery
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 import logging
-from config.bq_client import client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
+from config.bq_client import get_bigquery_client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def run_query(query: str, job_config: bigquery.QueryJobConfig) -> List[bigquery.Row]:
+    """Run a query in a worker thread so the blocking client call doesn't stall the event loop"""
+    return await asyncio.to_thread(lambda: list(get_bigquery_client().query(query, job_config=job_config).result()))
+
 async def get_daily_sales(start_date: date, end_date: Optional[date] = None) -> List[dict]:
     """Get daily sales metrics between start_date and end_date"""
     if not end_date:
@@ -33,8 +38,7 @@ async def get_daily_sales(start_date: date, end_date: Optional[date] = None) ->
     )
     
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = await run_query(query, job_config)
         
         return [
             {
@@ -74,8 +78,7 @@ async def get_daily_predictions(start_date: date, end_date: Optional[date] = Non
     )
     
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = await run_query(query, job_config)
         
         return [
             {
@@ -139,8 +142,7 @@ async def get_actuals_vs_predictions(start_date: date, end_date: Optional[date]
     )
     
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = await run_query(query, job_config)
         
         return [
             {
@@ -184,8 +186,7 @@ async def get_sales_by_region(start_date: date, end_date: Optional[date] = None)
     )
     
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = await run_query(query, job_config)
         
         return [
             {
@@ -221,8 +222,7 @@ async def get_kpi_metrics(start_date: date, end_date: date) -> Dict[str, Any]:
     )
     
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = query_job.result()
+        results = await run_query(query, job_config)
         
         for row in results:
             return {
@@ -259,8 +259,7 @@ async def get_monthly_sales(start_date: date, end_date: date) -> List[dict]:
         ]
     )
     
-    query_job = client.query(query, job_config=job_config)
-    results = query_job.result()
+    results = await run_query(query, job_config)
     
     return [dict(row) for row in results]
 
@@ -287,8 +286,7 @@ async def get_quarterly_sales(start_date: date, end_date: date) -> List[dict]:
         ]
     )
     
-    query_job = client.query(query, job_config=job_config)
-    results = query_job.result()
+    results = await run_query(query, job_config)
     
     return [dict(row) for row in results]
 
@@ -316,8 +314,7 @@ async def get_region_time_series(region: str, start_date: date, end_date: date)
         ]
     )
     
-    query_job = client.query(query, job_config=job_config)
-    results = query_job.result()
+    results = await run_query(query, job_config)
     
     return [dict(row) for row in results]
 
@@ -347,7 +344,6 @@ async def get_top_products(start_date: date, end_date: Optional[date] = None, li
         ]
     )
     
-    query_job = client.query(query, job_config=job_config)
-    results = query_job.result()
+    results = await run_query(query, job_config)
     
     return [dict(row) for row in results] 
\ No newline at end of file
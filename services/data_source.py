@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
+import calendar
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
 import requests
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
 import streamlit as st
 import logging
 
@@ -13,6 +16,31 @@ from config.settings import settings, DataSource
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Grain of the pre-aggregated dashboard view (scripts/create_aggregate_view.sql)
+AGGREGATE_KEYS = ['date', 'ProductCategoryName', 'StoreName', 'StoreType']
+
+MONTH_NAMES = list(calendar.month_name[1:])
+
+# Compact dtypes applied to query results at ingest: 32-bit numbers halve the
+# memory scanned by every downstream sum, and low-cardinality labels become
+# categoricals (group by them with observed=True). net_sales is pinned to
+# float64 instead: its totals are shown to the cent, which float32 sums cannot
+# hold, and REST JSON would otherwise decode whole-dollar amounts as int64.
+COMPACT_DTYPES = {
+    'year': 'Int16',
+    'month': 'Int8',
+    'week': 'Int8',
+    'month_name': pd.CategoricalDtype(MONTH_NAMES, ordered=True),
+    'net_sales': 'float64',
+    'DiscountAmount': 'float32',
+    'SalesQuantity': 'Int32',
+    'ReturnQuantity': 'Int32',
+    'transaction_count': 'Int32',
+    'ProductCategoryName': 'category',
+    'StoreName': 'category',
+    'StoreType': 'category'
+}
+
 class DataSourceInterface(ABC):
     """Abstract interface for data sources."""
     
@@ -23,16 +51,89 @@ class DataSourceInterface(ABC):
         quarter: Optional[int] = None,
         month: Optional[int] = None,
         week: Optional[int] = None,
-        limit: Optional[int] = 700
+        limit: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Load data for the dashboard with various time filters."""
+        """Load data for the dashboard with various time filters.
+
+        Filters are applied by the source itself, so only matching rows are
+        transferred; ``limit`` is an optional cap, not a default one.
+        """
         pass
+    
+    def dataset_version(self) -> str:
+        """Token that changes whenever the underlying data changes.
+        
+        Used as part of cache keys so cached results are shared until the
+        data itself is updated. Sources without change tracking return a
+        constant and rely on cache TTLs instead.
+        """
+        return ""
+    
+    # Pre-aggregated totals. These defaults aggregate the full dashboard data
+    # client-side; sources that can aggregate at the source override them.
+    
+    @staticmethod
+    def _compact(df: pd.DataFrame) -> pd.DataFrame:
+        """Cast known columns to their COMPACT_DTYPES at ingest."""
+        return df.astype({col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns})
+    
+    @staticmethod
+    def _with_date_column(df: pd.DataFrame, source: str = 'DateKey') -> pd.DataFrame:
+        """Add a datetime64[ns] 'date' column and return the frame sorted by it.
+        
+        Grouping on datetime64 takes pandas' int64 hash path rather than hashing
+        date objects. Results usually arrive ordered, so sorting is skipped then.
+        """
+        df['date'] = pd.to_datetime(df[source]).astype('datetime64[ns]')
+        if not df['date'].is_monotonic_increasing:
+            df = df.sort_values('date', kind='mergesort')
+        return df
+    
+    @staticmethod
+    def _sum_by(df: pd.DataFrame, keys: List[str], values: List[str]) -> pd.DataFrame:
+        """Sum value columns per key; raises ValueError if the frame lacks any of them."""
+        missing = [col for col in keys + values if col not in df.columns]
+        if missing:
+            raise ValueError(f"Source data is missing columns required for aggregation: {missing}")
+        return df.groupby(keys, as_index=False, observed=True)[values].sum()
+    
+    def load_dashboard_aggregate(
+        self,
+        year: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> pd.DataFrame:
+        """Load actual net sales and units sold per day, product category and store.
+        
+        Requires load_dashboard_data to return the AGGREGATE_KEYS columns.
+        """
+        df_actual, _ = self.load_dashboard_data(year=year, limit=None, start_date=start_date, end_date=end_date)
+        return self._sum_by(df_actual, AGGREGATE_KEYS, ['net_sales', 'SalesQuantity'])
+    
+    def load_daily_totals(
+        self,
+        year: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Load daily net sales totals as (actual, predicted) frames with date and net_sales."""
+        df_actual, df_predicted = self.load_dashboard_data(year=year, limit=None, start_date=start_date, end_date=end_date)
+        # The two groupbys are independent and release the GIL, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            actual_future = executor.submit(self._sum_by, df_actual, ['date'], ['net_sales'])
+            predicted_future = executor.submit(self._sum_by, df_predicted, ['date'], ['net_sales'])
+            return actual_future.result(), predicted_future.result()
 
 class BigQueryDataSource(DataSourceInterface):
     """BigQuery implementation of the data source interface."""
     
     def __init__(self):
         self.client = bigquery.Client()
+        # Results are downloaded as Arrow record batches over the Storage Read
+        # API in parallel streams; one long-lived client reuses its gRPC channel
+        self.bqstorage_client = bigquery_storage.BigQueryReadClient()
         self._validate_connection()
     
     def _validate_connection(self):
@@ -47,57 +148,123 @@ class BigQueryDataSource(DataSourceInterface):
         except Exception as e:
             raise ConnectionError(f"Failed to validate BigQuery connection: {str(e)}")
     
+    def dataset_version(self) -> str:
+        """Last modification time of the actuals and predictions tables."""
+        dataset_ref = self.client.dataset(settings.BQ_DATASET)
+        modified = [
+            self.client.get_table(f"{dataset_ref}.{table}").modified
+            for table in (settings.BQ_ACTUALS_TABLE, settings.BQ_PREDICTIONS_TABLE)
+        ]
+        return "|".join(m.isoformat() if m else "" for m in modified)
+    
+    def _job_to_dataframe(self, job: bigquery.QueryJob) -> pd.DataFrame:
+        """Wait for a submitted query job and download its result as a DataFrame."""
+        df = job.to_dataframe(bqstorage_client=self.bqstorage_client)
+        df = self._compact(df)
+        logger.debug(f"Retrieved {len(df)} records")
+        return df
+    
+    def _query_to_dataframe(self, query: str, job_config: bigquery.QueryJobConfig) -> pd.DataFrame:
+        """Run a query and download its result as a DataFrame."""
+        return self._job_to_dataframe(self.client.query(query, job_config=job_config))
+    
+    def _query_dataframes(self, queries: List[str], job_config: bigquery.QueryJobConfig) -> List[pd.DataFrame]:
+        """Run queries concurrently; latency is that of the slowest one.
+        
+        All jobs are submitted up front so BigQuery executes them in parallel,
+        then their results are downloaded on worker threads.
+        """
+        jobs = [self.client.query(query, job_config=job_config) for query in queries]
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            return list(executor.map(self._job_to_dataframe, jobs))
+    
+    @staticmethod
+    def _job_config(params: List[bigquery.ScalarQueryParameter]) -> bigquery.QueryJobConfig:
+        """Query job configuration shared by the dashboard queries."""
+        return bigquery.QueryJobConfig(
+            query_parameters=params,
+            use_query_cache=True,
+            priority=bigquery.QueryPriority.BATCH
+        )
+    
+    @staticmethod
+    def _build_filters(
+        year: Optional[int] = None,
+        quarter: Optional[int] = None,
+        month: Optional[int] = None,
+        week: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Tuple[str, List[bigquery.ScalarQueryParameter]]:
+        """Build a parameterized WHERE clause on DateKey so BigQuery can prune at the source."""
+        conditions = []
+        params = []
+        for part, value in (("YEAR", year), ("QUARTER", quarter), ("MONTH", month), ("WEEK", week)):
+            if value:
+                conditions.append(f"EXTRACT({part} FROM DateKey) = @{part.lower()}")
+                params.append(bigquery.ScalarQueryParameter(part.lower(), "INT64", value))
+        if start_date:
+            conditions.append("DateKey >= @start_date")
+            params.append(bigquery.ScalarQueryParameter("start_date", "DATE", start_date))
+        if end_date:
+            conditions.append("DateKey <= @end_date")
+            params.append(bigquery.ScalarQueryParameter("end_date", "DATE", end_date))
+        
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, params
+    
+    @property
+    def _actuals_table(self) -> str:
+        return f"`{settings.GCP_PROJECT_ID}.{settings.BQ_DATASET}.{settings.BQ_ACTUALS_TABLE}`"
+    
+    @property
+    def _predictions_table(self) -> str:
+        return f"`{settings.GCP_PROJECT_ID}.{settings.BQ_DATASET}.{settings.BQ_PREDICTIONS_TABLE}`"
+    
+    @property
+    def _aggregate_view(self) -> str:
+        return f"`{settings.GCP_PROJECT_ID}.{settings.BQ_DATASET}.{settings.BQ_AGGREGATE_VIEW}`"
+    
     def load_dashboard_data(
         self,
         year: Optional[int] = None,
         quarter: Optional[int] = None,
         month: Optional[int] = None,
         week: Optional[int] = None,
-        limit: Optional[int] = 700
+        limit: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Load data from BigQuery with time-based filtering."""
         
         # Build WHERE clause based on filters
-        conditions = []
-        if year:
-            conditions.append(f"EXTRACT(YEAR FROM DateKey) = {year}")
-        if quarter:
-            conditions.append(f"EXTRACT(QUARTER FROM DateKey) = {quarter}")
-        if month:
-            conditions.append(f"EXTRACT(MONTH FROM DateKey) = {month}")
-        if week:
-            conditions.append(f"EXTRACT(WEEK FROM DateKey) = {week}")
-            
-        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        where_clause, params = self._build_filters(year, quarter, month, week, start_date, end_date)
         limit_clause = f"LIMIT {limit}" if limit else ""
         
-        logger.debug(f"Applying filters: {conditions}")
+        logger.debug(f"Applying filters: {where_clause}")
         
-        # Actual data query with daily aggregation
+        # Actual data query with daily aggregation; only the listed columns
+        # are read from the table, so add new ones here explicitly
         actual_query = f"""
-        WITH daily_aggregates AS (
-            SELECT
-                DateKey,
-                EXTRACT(YEAR FROM DateKey) as year,
-                EXTRACT(MONTH FROM DateKey) as month,
-                FORMAT_DATE('%B', DateKey) as month_name,
-                CONCAT('Q', CAST(EXTRACT(QUARTER FROM DateKey) AS STRING)) as quarter,
-                EXTRACT(WEEK FROM DateKey) as week,
-                ProductCategoryName,
-                SUM(SalesAmount) as net_sales,
-                SUM(SalesQuantity) as SalesQuantity,
-                SUM(ReturnQuantity) as ReturnQuantity,
-                SUM(DiscountAmount) as DiscountAmount,
-                COUNT(*) as transaction_count
-            FROM `{settings.GCP_PROJECT_ID}.{settings.BQ_DATASET}.{settings.BQ_ACTUALS_TABLE}`
-            {where_clause}
-            GROUP BY 
-                DateKey, ProductCategoryName
-            {limit_clause}
-        )
-        SELECT *
-        FROM daily_aggregates
+        SELECT
+            DateKey,
+            EXTRACT(YEAR FROM DateKey) as year,
+            EXTRACT(MONTH FROM DateKey) as month,
+            FORMAT_DATE('%B', DateKey) as month_name,
+            CONCAT('Q', CAST(EXTRACT(QUARTER FROM DateKey) AS STRING)) as quarter,
+            EXTRACT(WEEK FROM DateKey) as week,
+            ProductCategoryName,
+            SUM(SalesAmount) as net_sales,
+            SUM(SalesQuantity) as SalesQuantity,
+            SUM(ReturnQuantity) as ReturnQuantity,
+            SUM(DiscountAmount) as DiscountAmount,
+            COUNT(*) as transaction_count
+        FROM {self._actuals_table}
+        {where_clause}
+        GROUP BY 
+            DateKey, ProductCategoryName
         ORDER BY DateKey
+        {limit_clause}
         """
         
         # Predicted data query
@@ -114,7 +281,7 @@ class BigQueryDataSource(DataSourceInterface):
             SUM(SalesQuantity) as SalesQuantity,
             SUM(ReturnQuantity) as ReturnQuantity,
             SUM(DiscountAmount) as DiscountAmount
-        FROM `{settings.GCP_PROJECT_ID}.{settings.BQ_DATASET}.{settings.BQ_PREDICTIONS_TABLE}`
+        FROM {self._predictions_table}
         {where_clause}
         GROUP BY 
             DateKey, ProductCategoryName
@@ -123,28 +290,16 @@ class BigQueryDataSource(DataSourceInterface):
         """
         
         try:
-            # Execute queries with job configuration
-            job_config = bigquery.QueryJobConfig(
-                use_query_cache=True,
-                priority=bigquery.QueryPriority.BATCH
+            # Execute both queries concurrently; latency is the slower of the two
+            logger.debug("Executing actual and predicted data queries...")
+            df_actual, df_predicted = self._query_dataframes(
+                [actual_query, predicted_query],
+                self._job_config(params)
             )
             
-            # Execute queries
-            logger.debug("Executing actual data query...")
-            df_actual = self.client.query(actual_query, job_config=job_config).to_dataframe()
-            logger.debug(f"Retrieved {len(df_actual)} actual records")
-            
-            logger.debug("Executing predicted data query...")
-            df_predicted = self.client.query(predicted_query, job_config=job_config).to_dataframe()
-            logger.debug(f"Retrieved {len(df_predicted)} predicted records")
-            
-            # Convert date columns
-            df_actual['date'] = pd.to_datetime(df_actual['DateKey'])
-            df_predicted['date'] = pd.to_datetime(df_predicted['DateKey'])
-            
-            # Sort by date
-            df_actual = df_actual.sort_values('date')
-            df_predicted = df_predicted.sort_values('date')
+            # Convert date columns and sort by date
+            df_actual = self._with_date_column(df_actual)
+            df_predicted = self._with_date_column(df_predicted)
             
             return df_actual, df_predicted
             
@@ -154,6 +309,53 @@ class BigQueryDataSource(DataSourceInterface):
             logger.debug(f"Predicted query: {predicted_query}")
             return pd.DataFrame(), pd.DataFrame()
 
+    def load_daily_totals(
+        self,
+        year: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Aggregate daily net sales in BigQuery for actuals and predictions."""
+        where_clause, params = self._build_filters(year=year, start_date=start_date, end_date=end_date)
+        queries = [
+            f"""
+            SELECT DateKey AS date, SUM(SalesAmount) AS net_sales
+            FROM {table}
+            {where_clause}
+            GROUP BY date
+            ORDER BY date
+            """
+            for table in (self._actuals_table, self._predictions_table)
+        ]
+        df_actual, df_predicted = self._query_dataframes(queries, self._job_config(params))
+        return self._with_date_column(df_actual, 'date'), self._with_date_column(df_predicted, 'date')
+    
+    def load_dashboard_aggregate(
+        self,
+        year: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> pd.DataFrame:
+        """Read the pre-aggregated daily x category x store materialized view.
+        
+        Category and store totals are rolled up from this small frame by the
+        interface defaults instead of scanning the actuals table again.
+        """
+        where_clause, params = self._build_filters(year=year, start_date=start_date, end_date=end_date)
+        query = f"""
+        SELECT
+            DateKey AS date,
+            ProductCategoryName,
+            StoreName,
+            StoreType,
+            net_sales,
+            SalesQuantity
+        FROM {self._aggregate_view}
+        {where_clause}
+        """
+        df = self._query_to_dataframe(query, self._job_config(params))
+        return self._with_date_column(df, 'date')
+
 class RestApiDataSource(DataSourceInterface):
     """REST API implementation of the data source interface."""
     
@@ -167,7 +369,7 @@ class RestApiDataSource(DataSourceInterface):
         try:
             response = self.session.get(endpoint, params=params)
             response.raise_for_status()
-            return pd.DataFrame(response.json())
+            return self._compact(pd.DataFrame(response.json()))
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Failed to fetch data from API: {str(e)}")
     
@@ -177,7 +379,9 @@ class RestApiDataSource(DataSourceInterface):
         quarter: Optional[int] = None,
         month: Optional[int] = None,
         week: Optional[int] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Load data from REST API."""
         params = {}
@@ -191,18 +395,29 @@ class RestApiDataSource(DataSourceInterface):
             params['week'] = week
         if limit:
             params['limit'] = limit
+        if start_date:
+            params['start_date'] = start_date
+        if end_date:
+            params['end_date'] = end_date
         
-        df_actual = self._fetch_data(settings.actuals_endpoint, params)
-        df_predicted = self._fetch_data(settings.predictions_endpoint, params)
+        # Fetch actuals and predictions concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            actual_future = executor.submit(self._fetch_data, settings.actuals_endpoint, params)
+            predicted_future = executor.submit(self._fetch_data, settings.predictions_endpoint, params)
+            df_actual = actual_future.result()
+            df_predicted = predicted_future.result()
         
         # Convert date columns
-        for df in [df_actual, df_predicted]:
-            df['date'] = pd.to_datetime(df['DateKey'])
-        
-        return df_actual, df_predicted
+        return self._with_date_column(df_actual), self._with_date_column(df_predicted)
 
+@st.cache_resource(show_spinner=False)
 def get_data_source() -> DataSourceInterface:
-    """Factory function to get the configured data source."""
+    """
+    Factory function to get the configured data source.
+    
+    Cached as a process-wide resource so every session shares one instance
+    (and one authenticated BigQuery client).
+    """
     if settings.DATA_SOURCE == DataSource.BIGQUERY:
         return BigQueryDataSource()
     elif settings.DATA_SOURCE == DataSource.REST_API:
@@ -1,10 +1,10 @@
 from utils.sales_calculations import load_dashboard_data
 import pandas as pd
-from config.bq_client import client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
+from config.bq_client import get_bigquery_client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
 
 def inspect_table_schema(table_id):
     """Get and print the schema of a BigQuery table."""
-    table = client.get_table(f"{PROJECT_ID}.{DATASET}.{table_id}")
+    table = get_bigquery_client().get_table(f"{PROJECT_ID}.{DATASET}.{table_id}")
     print(f"\nSchema for {table_id}:")
     for field in table.schema:
         print(f"- {field.name} ({field.field_type})")
@@ -17,7 +17,7 @@ def test_connection():
     
     # Test if we can list datasets
     try:
-        datasets = list(client.list_datasets())
+        datasets = list(get_bigquery_client().list_datasets())
         print(f"\nAvailable datasets:")
         for dataset in datasets:
             print(f"- {dataset.dataset_id}")
@@ -27,7 +27,7 @@ def test_connection():
 
     # Test if we can list tables in our dataset
     try:
-        tables = list(client.list_tables(f"{PROJECT_ID}.{DATASET}"))
+        tables = list(get_bigquery_client().list_tables(f"{PROJECT_ID}.{DATASET}"))
         print(f"\nAvailable tables in {DATASET}:")
         for table in tables:
             print(f"- {table.table_id}")
@@ -45,7 +45,7 @@ def test_simple_query():
     FROM `{PROJECT_ID}.{DATASET}.{ACTUALS_TABLE}`
     """
     try:
-        result = client.query(query).result()
+        result = get_bigquery_client().query(query).result()
         for row in result:
             print(f"Number of rows in {ACTUALS_TABLE}: {row.count:,}")
             print(f"Date range: {row.min_date} to {row.max_date}")
@@ -1,4 +1,5 @@
 import requests
+import pyarrow as pa
 from datetime import datetime, timedelta
 
 BASE_URL = "http://localhost:8000"
@@ -77,10 +78,29 @@ def test_kpi_metrics():
     else:
         print("\n❌ KPI Metrics Endpoint Error:", response.text)
 
+def test_arrow_formats():
+    """Test that Arrow responses still decode when served from the cache"""
+    start_date = "2007-01-01"
+    end_date = "2007-01-31"
+    
+    for endpoint in ["daily-sales", "product-categories", "store-performance"]:
+        # The second request is answered from the response cache
+        for _ in range(2):
+            response = requests.get(
+                f"{BASE_URL}/api/{endpoint}",
+                params={"start_date": start_date, "end_date": end_date, "format": "arrow"}
+            )
+        
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        print(f"\n✅ {endpoint} (arrow, cached): {table.num_rows} rows")
+
 if __name__ == "__main__":
     print("Testing API endpoints...")
     test_daily_sales()
     test_predictions()
     test_regions()
     test_kpi_metrics()
+    test_arrow_formats()
     print("\nDone testing!") 
\ No newline at end of file
@@ -1,19 +1,16 @@
-from config.bq_client import client, PROJECT_ID, DATASET, ACTUALS_TABLE
+from config.bq_client import get_bigquery_client, PROJECT_ID, DATASET, ACTUALS_TABLE
 import pandas as pd
 
 def test_connection():
     print("Testing BigQuery Connection...")
     
-    # Test query to get a few rows
-    query = f"""
-    SELECT *
-    FROM `{PROJECT_ID}.{DATASET}.{ACTUALS_TABLE}`
-    LIMIT 5
-    """
-    
     try:
-        # Execute query
-        df = client.query(query).to_dataframe()
+        # Preview a few rows through the table read API; a SELECT * ... LIMIT
+        # query would be billed for scanning every column of the table
+        df = get_bigquery_client().list_rows(
+            f"{PROJECT_ID}.{DATASET}.{ACTUALS_TABLE}",
+            max_results=5
+        ).to_dataframe()
         
         # Print results
         print("\nConnection successful!")
@@ -1,4 +1,6 @@
 import requests
+import pandas as pd
+import pyarrow as pa
 from typing import Dict, Any, Optional
 from datetime import datetime, date
 
@@ -28,6 +30,20 @@ class APIClient:
             params["end_date"] = end_date
         return self._make_request("GET", "api/daily-sales", params=params)
 
+    def get_daily_sales_frame(self, start_date: str, end_date: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Get daily sales data as a DataFrame, transferred as an Arrow IPC stream."""
+        url = f"{self.base_url}/api/daily-sales"
+        params = {"start_date": start_date, "format": "arrow"}
+        if end_date:
+            params["end_date"] = end_date
+        try:
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            return pa.ipc.open_stream(response.content).read_pandas()
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request to {url}: {str(e)}")
+            return None
+
     def get_predictions(self, start_date: str, end_date: Optional[str] = None) -> Dict[str, Any]:
         """Get sales predictions."""
         params = {"start_date": start_date}
@@ -53,6 +69,13 @@ class APIClient:
             params["end_date"] = end_date
         return self._make_request("GET", "api/kpi-metrics", params=params)
 
+    def get_dashboard(self, start_date: str, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """Get actuals, predictions and regional sales in a single request."""
+        params = {"start_date": start_date}
+        if end_date:
+            params["end_date"] = end_date
+        return self._make_request("GET", "api/dashboard", params=params)
+
     def get_dashboard_stats(self) -> Dict[str, Any]:
         """Get dashboard statistics."""
         return self._make_request("GET", "api/dashboard/stats")
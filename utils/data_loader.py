@@ -1,8 +1,9 @@
 """Data loading utilities for the Sales Ninja dashboard."""
 
 import streamlit as st
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Tuple
+import numpy as np
 import pandas as pd
 
 from services.data_source import get_data_source
@@ -10,6 +11,7 @@ from config.settings import settings
 from .sales_calculations import (
     calculate_daily_net_sales,
     get_sales_summary_stats,
+    sum_and_count_by_key,
     get_available_years,
     get_available_months,
     get_available_weeks
@@ -22,75 +24,84 @@ def initialize_session_state():
         st.session_state['actual_data'] = actual_data
         st.session_state['predicted_data'] = predicted_data
 
+# The aggregations below only depend on their filter arguments and the shared
+# cached dataset, so their results are cached per filter combination too. They
+# read the dataset through _load_data, keeping the spinner out of cached bodies.
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_geography_data():
     """Get geography-related data from the loaded dataset."""
-    initialize_session_state()
-    df = st.session_state['actual_data']
+    df, _ = _load_data(None, None, None)
     
     # Group by continent and calculate total sales
-    geography_data = df.groupby('continent')['net_sales'].sum().reset_index()
+    geography_data = df.groupby('continent', as_index=False)['net_sales'].sum()
     return geography_data
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_daily_sales(year=None, month=None, week=None):
     """Get daily sales data for both actual and predicted."""
-    initialize_session_state()
+    actual_data, predicted_data = _load_data(None, None, None)
     return calculate_daily_net_sales(
-        st.session_state['actual_data'],
-        st.session_state['predicted_data'],
+        actual_data,
+        predicted_data,
         year, month, week
     )
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_kpi_metrics(year=None, month=None, week=None):
     """Get KPI metrics for the dashboard."""
-    initialize_session_state()
+    actual_data, predicted_data = _load_data(None, None, None)
     actual_stats, predicted_stats = get_sales_summary_stats(
-        st.session_state['actual_data'],
-        st.session_state['predicted_data'],
+        actual_data,
+        predicted_data,
         year, month, week
     )
     return actual_stats, predicted_stats
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_promotion_impact():
     """Get promotion impact data."""
-    initialize_session_state()
-    df = st.session_state['actual_data']
+    df, _ = _load_data(None, None, None)
     
-    # Group by promotion flag and calculate average sales
-    promotion_data = df.groupby('PromotionKey')['net_sales'].agg(['mean', 'count']).reset_index()
-    promotion_data.columns = ['promotion_id', 'avg_sales', 'count']
-    return promotion_data
+    # Sum and count sales per promotion in one pass, then derive the average
+    promotion_ids, sums, counts = sum_and_count_by_key(df['PromotionKey'], df['net_sales'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_sales = sums / counts
+    return pd.DataFrame({
+        'promotion_id': promotion_ids,
+        'avg_sales': avg_sales,
+        'count': counts
+    })
+
+# Shared read-only frames: returned by reference instead of unpickled per rerun.
+# Callers must not mutate them.
+@st.cache_resource(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def _load_data(y: Optional[int], sd: Optional[date], ed: Optional[date]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    return get_data_source().load_dashboard_data(
+        year=y,
+        start_date=sd,
+        end_date=ed
+    )
 
 def load_dashboard_data(
     year: Optional[int] = None,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load and cache dashboard data.
     
     Args:
         year: Optional year filter
-        start_date: Optional start date (YYYY-MM-DD)
-        end_date: Optional end date (YYYY-MM-DD)
+        start_date: Optional start date
+        end_date: Optional end date
     
     Returns:
         Tuple of (actual_data, predicted_data) DataFrames
     """
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
-    def _load_data(y: Optional[int], sd: Optional[str], ed: Optional[str]):
-        if 'data_source' not in st.session_state:
-            st.session_state.data_source = get_data_source()
-        
-        with st.spinner("Loading sales data..."):
-            return st.session_state.data_source.load_dashboard_data(
-                year=y,
-                start_date=sd,
-                end_date=ed
-            )
-    
-    return _load_data(year, start_date, end_date)
+    with st.spinner("Loading sales data..."):
+        return _load_data(year, start_date, end_date)
 
-def get_date_filters() -> Tuple[Optional[int], Optional[str], Optional[str]]:
+def get_date_filters() -> Tuple[Optional[int], Optional[date], Optional[date]]:
     """Get date filters from sidebar."""
     st.sidebar.header("📅 Date Range")
     filter_type = st.sidebar.radio(
@@ -122,4 +133,4 @@ def get_date_filters() -> Tuple[Optional[int], Optional[str], Optional[str]]:
                 min_value=datetime(2007, 1, 1),
                 max_value=datetime(2009, 12, 31)
             )
-        return None, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d") 
\ No newline at end of file
+        return None, start_date, end_date 
\ No newline at end of file
@@ -14,21 +14,13 @@ def prepare_geography_data(df: pd.DataFrame) -> pd.DataFrame:
         DataFrame aggregated by geography with sales metrics
     """
     # Group by geography columns and calculate metrics
-    geo_data = df.groupby(['country', 'continent']).agg({
-        'net_sales': ['sum', 'mean'],
-        'SalesQuantity': 'sum',
-        'ReturnQuantity': 'sum',
-        'DiscountAmount': 'sum'
-    }).round(2)
-    
-    # Flatten column names
-    geo_data.columns = [
-        f"{col[0]}_{col[1]}" if col[1] != '' else col[0]
-        for col in geo_data.columns
-    ]
-    
-    # Reset index to make geography columns regular columns
-    geo_data = geo_data.reset_index()
+    geo_data = df.groupby(['country', 'continent'], as_index=False).agg(
+        net_sales_sum=('net_sales', 'sum'),
+        net_sales_mean=('net_sales', 'mean'),
+        SalesQuantity_sum=('SalesQuantity', 'sum'),
+        ReturnQuantity_sum=('ReturnQuantity', 'sum'),
+        DiscountAmount_sum=('DiscountAmount', 'sum')
+    ).round(2)
     
     # Calculate additional metrics
     geo_data['return_rate'] = (
@@ -107,7 +99,7 @@ def calculate_geographic_sales(df: pd.DataFrame,
         groupby_cols = ['Year', 'Quarter'] + groupby_cols
     
     # Calculate sales by continent
-    sales_data = df.groupby(groupby_cols)['SalesAmount'].sum().reset_index()
+    sales_data = df.groupby(groupby_cols, as_index=False)['SalesAmount'].sum()
     
     # Format the date/period information
     if period == 'D':
@@ -1,6 +1,7 @@
 """Page configuration utilities for the Sales Ninja dashboard."""
 
 import streamlit as st
+from functools import lru_cache
 
 def set_page_config(page_title: str):
     """Configure the page settings."""
@@ -26,15 +27,30 @@ def set_page_config(page_title: str):
         </style>
     """, unsafe_allow_html=True)
 
-def add_page_title(title: str, subtitle: str = None, emoji: str = None):
-    """Add a styled title and optional subtitle to the page.
+def add_stylesheet(filename: str):
+    """Link a stylesheet from ./static, served by Streamlit's static file serving.
     
-    Args:
-        title: The title text to display
-        subtitle: Optional subtitle to display below the title
-        emoji: Optional emoji to display before the title
+    The browser fetches and caches the file once instead of receiving the
+    rules inline with every script run.
     """
-    st.markdown(f"""
+    st.markdown(f'<link rel="stylesheet" href="app/static/{filename}">', unsafe_allow_html=True)
+
+def render_metrics(metrics: dict):
+    """Render label -> value metric cards as one HTML element.
+    
+    Replaces a row of st.columns + st.metric calls, which sends one delta per
+    column and per metric. Requires the metrics.css stylesheet.
+    """
+    cards = "".join(
+        f'<div><div class="metric-label">{label}</div><div class="metric-value">{value}</div></div>'
+        for label, value in metrics.items()
+    )
+    st.markdown(f'<div class="metric-grid">{cards}</div>', unsafe_allow_html=True)
+
+@lru_cache(maxsize=None)
+def _page_title_html(title: str, subtitle: str = None, emoji: str = None) -> str:
+    """Build the page title block once per distinct title."""
+    return f"""
         <div style="
             background: linear-gradient(135deg, rgba(65, 105, 225, 0.1), rgba(147, 112, 219, 0.1));
             padding: 2rem;
@@ -59,5 +75,18 @@ def add_page_title(title: str, subtitle: str = None, emoji: str = None):
             </h1>
             {f'<p style="color: #9370DB; margin: 0.5rem 0 0 0; font-size: 1.2em; opacity: 0.8;">{subtitle}</p>' if subtitle else ''}
         </div>
-    """, unsafe_allow_html=True)
-    st.markdown("---")  # Add a separator line 
\ No newline at end of file
+        <hr>
+    """
+
+def add_page_title(title: str, subtitle: str = None, emoji: str = None):
+    """Add a styled title and optional subtitle to the page.
+    
+    The title block and separator line are sent as a single element, and the
+    HTML is formatted only the first time a page renders.
+    
+    Args:
+        title: The title text to display
+        subtitle: Optional subtitle to display below the title
+        emoji: Optional emoji to display before the title
+    """
+    st.markdown(_page_title_html(title, subtitle, emoji), unsafe_allow_html=True)
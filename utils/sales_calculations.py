@@ -5,11 +5,14 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from google.cloud import bigquery
-from config.bq_client import client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
+from config.bq_client import get_bigquery_client, PROJECT_ID, DATASET, ACTUALS_TABLE, PREDICTIONS_TABLE
 
 from services.data_source import get_data_source
 from config.settings import settings
 
+# Approximate plot width in pixels; daily series longer than this are downsampled
+CHART_WIDTH_PX = 1000
+
 def load_dashboard_data(
     year: Optional[int] = 2007,
     start_date: Optional[str] = None,
@@ -92,12 +95,16 @@ def load_dashboard_data(
             use_query_cache=True
         )
         
-        # Execute queries with job configuration
-        df_actual = client.query(actual_query, job_config=job_config).to_dataframe()
+        # Submit both jobs before waiting on either so BigQuery runs them in parallel
+        client = get_bigquery_client()
+        actual_job = client.query(actual_query, job_config=job_config)
+        predicted_job = client.query(predicted_query, job_config=job_config)
+        
+        df_actual = actual_job.to_dataframe()
         print(f"Loaded {len(df_actual):,} rows of actual data")
         
         print("\nLoading predicted sales data...")
-        df_predicted = client.query(predicted_query, job_config=job_config).to_dataframe()
+        df_predicted = predicted_job.to_dataframe()
         print(f"Loaded {len(df_predicted):,} rows of predicted data")
         
         # Convert date columns to datetime
@@ -113,29 +120,49 @@ def load_dashboard_data(
 
 def calculate_daily_net_sales(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate daily net sales from transaction data."""
-    return df.groupby('date')['net_sales'].sum().reset_index()
+    return df.groupby('date', as_index=False).agg(net_sales=('net_sales', 'sum'))
+
+def sum_and_count_by_key(keys: pd.Series, values: pd.Series) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+    """
+    Sum and count the non-null values for each key in one pass over the raw arrays.
+    
+    Returns:
+        Tuple of (sorted unique keys, per-key sums, per-key counts)
+    """
+    codes, uniques = pd.factorize(keys, sort=True)
+    values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(values)
+    
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=len(uniques))
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    return uniques, sums, counts
 
 def get_sales_summary_stats(df: pd.DataFrame) -> Dict[str, float]:
     """Calculate summary statistics for sales data."""
+    net_sales = df['net_sales'].to_numpy(dtype=np.float64, na_value=np.nan)
+    net_sales = net_sales[~np.isnan(net_sales)]
+    total_sales = net_sales.sum()
+    has_sales = net_sales.size > 0
+    
     return {
-        'total_sales': df['net_sales'].sum(),
-        'avg_daily_sales': df['net_sales'].mean(),
-        'max_daily_sales': df['net_sales'].max(),
-        'min_daily_sales': df['net_sales'].min(),
+        'total_sales': total_sales,
+        'avg_daily_sales': total_sales / net_sales.size if has_sales else np.nan,
+        'max_daily_sales': net_sales.max() if has_sales else np.nan,
+        'min_daily_sales': net_sales.min() if has_sales else np.nan,
         'total_transactions': len(df),
         'total_quantity': df['SalesQuantity'].sum()
     }
 
 def calculate_category_performance(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate sales performance by product category."""
-    return df.groupby('ProductCategoryName').agg({
+    return df.groupby('ProductCategoryName', observed=True).agg({
         'net_sales': ['sum', 'mean', 'count'],
         'SalesQuantity': 'sum'
     }).round(2)
 
 def calculate_store_performance(df: pd.DataFrame) -> pd.DataFrame:
     """Calculate sales performance by store."""
-    return df.groupby(['StoreName', 'StoreType']).agg({
+    return df.groupby(['StoreName', 'StoreType'], observed=True).agg({
         'net_sales': ['sum', 'mean', 'count'],
         'SalesQuantity': 'sum'
     }).round(2)
@@ -172,8 +199,8 @@ def calculate_prediction_accuracy(
         DataFrame with accuracy metrics
     """
     if group_by:
-        actual_grouped = actual.groupby([group_by, 'date'])['net_sales'].sum().reset_index()
-        predicted_grouped = predicted.groupby([group_by, 'date'])['net_sales'].sum().reset_index()
+        actual_grouped = actual.groupby([group_by, 'date'], as_index=False, observed=True)['net_sales'].sum()
+        predicted_grouped = predicted.groupby([group_by, 'date'], as_index=False, observed=True)['net_sales'].sum()
         
         # Merge actual and predicted
         comparison = actual_grouped.merge(
@@ -183,7 +210,7 @@ def calculate_prediction_accuracy(
         )
         
         # Calculate metrics by group
-        metrics = comparison.groupby(group_by).apply(lambda x: pd.Series({
+        metrics = comparison.groupby(group_by, observed=True).apply(lambda x: pd.Series({
             'MAPE': np.mean(np.abs((x['net_sales_actual'] - x['net_sales_predicted']) / x['net_sales_actual'])) * 100,
             'Accuracy': 100 - np.mean(np.abs((x['net_sales_actual'] - x['net_sales_predicted']) / x['net_sales_actual'])) * 100,
             'Total_Actual': x['net_sales_actual'].sum(),
@@ -213,6 +240,28 @@ def calculate_prediction_accuracy(
     
     return metrics
 
+def _period_net_sales(df: pd.DataFrame, freq: str, year: Optional[int] = None) -> pd.Series:
+    """Sum net sales per calendar period, touching only the date and net_sales columns.
+    
+    Periods are int64 keys, year * 100 + month for 'M' and year * 10 + quarter
+    for 'Q', so the groupby takes pandas' integer hash path rather than
+    grouping Period objects.
+    """
+    dates = df['date']
+    net_sales = df['net_sales']
+    
+    if year is not None:
+        in_year = (dates.dt.year == year).to_numpy()
+        dates = dates[in_year]
+        net_sales = net_sales[in_year]
+    
+    years = dates.dt.year.to_numpy(dtype='int64')
+    if freq == 'M':
+        keys = years * 100 + dates.dt.month.to_numpy(dtype='int64')
+    else:
+        keys = years * 10 + dates.dt.quarter.to_numpy(dtype='int64')
+    return net_sales.groupby(keys, sort=True).sum()
+
 def calculate_monthly_net_sales(
     df_actual: pd.DataFrame,
     df_predicted: pd.DataFrame,
@@ -222,18 +271,15 @@ def calculate_monthly_net_sales(
     Calculate monthly net sales for both actual and predicted data.
     """
     def process_monthly(df):
-        data = df.copy()
-        
-        if year is not None:
-            data = data[data['date'].dt.year == year]
-        
-        data['year'] = data['date'].dt.year
-        data['month'] = data['date'].dt.month
+        monthly = _period_net_sales(df, 'M', year)
+        years, months = np.divmod(monthly.index.to_numpy(), 100)
         
-        monthly_sales = data.groupby(['year', 'month'])['net_sales'].sum().reset_index()
-        monthly_sales['date'] = pd.to_datetime(monthly_sales[['year', 'month']].assign(day=1))
-        
-        return monthly_sales.sort_values('date')
+        return pd.DataFrame({
+            'year': years,
+            'month': months,
+            'net_sales': monthly.to_numpy(),
+            'date': pd.to_datetime({'year': years, 'month': months, 'day': 1})
+        })
     
     return process_monthly(df_actual), process_monthly(df_predicted)
 
@@ -246,19 +292,17 @@ def calculate_quarterly_net_sales(
     Calculate quarterly net sales for both actual and predicted data.
     """
     def process_quarterly(df):
-        data = df.copy()
-        
-        if year is not None:
-            data = data[data['date'].dt.year == year]
-        
-        data['year'] = data['date'].dt.year
-        data['quarter'] = data['date'].dt.quarter
+        quarterly = _period_net_sales(df, 'Q', year)
+        years, quarters = np.divmod(quarterly.index.to_numpy(), 10)
+        months = quarters * 3 - 2
         
-        quarterly_sales = data.groupby(['year', 'quarter'])['net_sales'].sum().reset_index()
-        quarterly_sales['month'] = quarterly_sales['quarter'] * 3 - 2
-        quarterly_sales['date'] = pd.to_datetime(quarterly_sales[['year', 'month']].assign(day=1))
-        
-        return quarterly_sales.sort_values('date')
+        return pd.DataFrame({
+            'year': years,
+            'quarter': quarters,
+            'net_sales': quarterly.to_numpy(),
+            'month': months,
+            'date': pd.to_datetime({'year': years, 'month': months, 'day': 1})
+        })
     
     return process_quarterly(df_actual), process_quarterly(df_predicted)
 
@@ -308,6 +352,29 @@ def get_quarterly_summary_stats(
     
     return actual_stats, predicted_stats
 
+def m4_downsample(df, x="date", y="net_sales", width=CHART_WIDTH_PX):
+    """
+    Reduce a time-sorted series to at most 4 points per pixel bucket (M4).
+    
+    Each of `width` equal-time buckets keeps its first, last, min and max rows,
+    which preserves the drawn line envelope while shrinking the payload sent
+    to the browser. Short series are returned unchanged.
+    """
+    if len(df) <= 4 * width:
+        return df
+    
+    df = df.reset_index(drop=True)
+    buckets = pd.cut(df[x].astype("int64"), bins=width, labels=False)
+    values = df[y].groupby(buckets)
+    rows = df.index.to_series().groupby(buckets)
+    keep = np.unique(np.concatenate([
+        rows.first().to_numpy(),
+        rows.last().to_numpy(),
+        values.idxmin().to_numpy(),
+        values.idxmax().to_numpy()
+    ]))
+    return df.iloc[keep]
+
 def get_available_years(df: pd.DataFrame) -> list:
     """Get list of unique years available in the dataset."""
     return sorted(df['date'].dt.year.unique().tolist())
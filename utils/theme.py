@@ -3,6 +3,9 @@ Central theme configuration for the Sales Ninja application.
 This file contains all color schemes and styling constants used across the app.
 """
 
+from functools import lru_cache
+from pathlib import Path
+
 # Main color scheme
 
 
@@ -62,6 +65,14 @@ STYLES = {
     """,
 }
 
+# Plotly config for small, decorative charts and tables: rendered without the
+# mode bar or any pan/zoom/hover handlers in the browser
+STATIC_CHART_CONFIG = {
+    'staticPlot': True,
+    'displayModeBar': False,
+    'scrollZoom': False
+}
+
 # Chart templates
 def get_chart_template():
     """Return a consistent chart template for use with plotly"""
@@ -98,144 +109,14 @@ def get_chart_template():
         }
     }
 
-# CSS for consistent styling across pages
+# CSS for consistent styling across pages; the rules live in static/theme.css
+THEME_CSS_PATH = Path(__file__).resolve().parent.parent / "static" / "theme.css"
+
+@lru_cache(maxsize=None)
 def get_css():
-    """Return CSS styles for consistent page styling"""
-    return """
-    <style>
-        /* Base text colors */
-        .stMarkdown, p, .stText {
-            color: #9370DB !important;  /* Medium Purple - darker shade of lavender */
-        }
-        
-        /* Metric labels and values */
-        [data-testid="stMetricLabel"] {
-            color: #4169E1 !important;  /* Royal Blue */
-            font-size: 1rem !important;
-            font-weight: 600 !important;
-        }
-        [data-testid="stMetricValue"] {
-            color: #191970 !important;  /* Midnight Blue */
-            font-size: 1.8rem !important;
-            font-weight: 600 !important;
-        }
-        
-        /* Headers */
-        .section-header {
-            color: #191970 !important;  /* Midnight Blue */
-            font-size: 1.5em !important;
-            font-weight: 600 !important;
-            margin: 1em 0 !important;
-            padding: 0.5em 0 !important;
-            border-bottom: 2px solid rgba(147, 112, 219, 0.3) !important;
-        }
-        
-        /* Filter area styling */
-        .stSelectbox label, .stMultiSelect label, .stSlider label {
-            color: #191970 !important;  /* Midnight Blue */
-            font-weight: 600 !important;
-            font-size: 1rem !important;
-        }
-        .stSelectbox > div > div[data-baseweb="select"] > div, 
-        .stMultiSelect > div > div[data-baseweb="select"] > div,
-        .stSelectbox > div > div > div[role="listbox"],
-        .stMultiSelect > div > div > div[role="listbox"] {
-            color: #191970 !important;  /* Midnight Blue */
-            font-weight: 500 !important;
-            background-color: rgba(255, 255, 255, 0.9) !important;
-        }
-        /* Filter options styling */
-        div[role="option"] {
-            color: #191970 !important;  /* Midnight Blue */
-            background-color: rgba(255, 255, 255, 0.9) !important;
-        }
-        div[role="option"]:hover {
-            background-color: rgba(65, 105, 225, 0.1) !important;
-        }
-        /* Selected option styling */
-        div[aria-selected="true"] {
-            background-color: rgba(65, 105, 225, 0.2) !important;
-            color: #191970 !important;  /* Midnight Blue */
-            font-weight: 600 !important;
-        }
-        
-        /* Tabs styling */
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 1em;
-            background-color: rgba(255, 255, 255, 0.1);
-            padding: 1em;
-            border-radius: 0.5em;
-        }
-        .stTabs [data-baseweb="tab"],
-        .stTabs [data-baseweb="tab"] span {
-            height: 3em;
-            white-space: pre-wrap;
-            background-color: #4169E1 !important;  /* Royal Blue */
-            border-radius: 0.5em;
-            color: #FFFFFF !important;  /* White */
-            font-size: 1em;
-            font-weight: 600;
-            border: none;
-            padding: 0 1em;
-            transition: all 0.3s ease;
-        }
-        .stTabs [data-baseweb="tab"]:hover,
-        .stTabs [data-baseweb="tab"]:hover span {
-            background-color: #6A5ACD !important;  /* Slate Blue */
-            color: #FFFFFF !important;  /* White */
-        }
-        .stTabs [aria-selected="true"],
-        .stTabs [aria-selected="true"] span {
-            background-color: #191970 !important;  /* Midnight Blue */
-            color: #FFFFFF !important;  /* White */
-            font-weight: 600;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.2);
-        }
-        /* Override any other text colors in tabs */
-        .stTabs [data-baseweb="tab"] * {
-            color: #FFFFFF !important;
-        }
-        
-        /* Table headers and cells */
-        .table-header {
-            color: #191970 !important;  /* Midnight Blue */
-            font-size: 1.5em !important;
-            font-weight: 600 !important;
-            margin: 1em 0 !important;
-        }
-        [data-testid="stDataFrameResizable"] {
-            color: #4169E1 !important;  /* Royal Blue */
-        }
-        
-        /* Sidebar */
-        [data-testid="stSidebar"] {
-            background-color: rgba(25, 25, 112, 0.3);
-            border-right: 1px solid rgba(147, 112, 219, 0.2);
-        }
-        [data-testid="stSidebar"] .stMarkdown {
-            color: #4169E1 !important;  /* Royal Blue */
-            font-weight: 600 !important;
-        }
-        [data-testid="stSidebar"] .stSelectbox label,
-        [data-testid="stSidebar"] .stMultiSelect label {
-            color: #4169E1 !important;  /* Royal Blue */
-        }
-        [data-testid="stSidebar"] .stSelectbox > div > div[data-baseweb="select"] > div,
-        [data-testid="stSidebar"] .stMultiSelect > div > div[data-baseweb="select"] > div {
-            color: #191970 !important;  /* Midnight Blue */
-            background-color: rgba(255, 255, 255, 0.9) !important;
-        }
-        
-        /* Buttons */
-        .stButton > button {
-            background-color: rgba(65, 105, 225, 0.2) !important;
-            color: #191970 !important;  /* Midnight Blue */
-            border: 1px solid rgba(147, 112, 219, 0.3) !important;
-            font-weight: 600 !important;
-        }
-        .stButton > button:hover {
-            background-color: rgba(65, 105, 225, 0.4) !important;
-            border: 1px solid rgba(147, 112, 219, 0.5) !important;
-        }
-    </style>
-    """ 
\ No newline at end of file
+    """Return CSS styles for consistent page styling.
+    
+    Pages should prefer add_stylesheet("theme.css"), which lets the browser
+    cache the file instead of receiving the rules on every rerun.
+    """
+    return f"<style>\n{THEME_CSS_PATH.read_text(encoding='utf-8')}</style>"